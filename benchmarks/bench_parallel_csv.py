@@ -0,0 +1,86 @@
+"""
+Benchmark parallel parsing of a large ERDDAP tabledap CSV against a single
+pd.read_csv call, for a range of worker counts.
+
+    python benchmarks/bench_parallel_csv.py --rows 5000000 --workers 1,2,4,8
+
+A synthetic CSV with ERDDAP's layout (header, units row, then station, time,
+latitude, longitude and measurement columns) is generated once in a temporary
+file unless --file points at a real download.
+"""
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from erddap_cli.client.parallel_csv import read_csv_parallel
+
+
+def make_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2020-01-01", tz="UTC")
+    df = pd.DataFrame({
+        "station":   np.char.add("st", rng.integers(0, 500, rows).astype(str)),
+        "time":      (start + pd.to_timedelta(rng.integers(0, 4 * 365 * 86400, rows), unit="s")).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "latitude":  rng.uniform(-80, 80, rows).round(4),
+        "longitude": rng.uniform(-180, 180, rows).round(4),
+        "depth":     rng.integers(0, 1000, rows),
+        "temp":      rng.normal(12, 6, rows).round(3),
+        "salinity":  rng.normal(35, 1, rows).round(3),
+    })
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(df.columns) + "\n")
+        f.write(",UTC,degrees_north,degrees_east,m,degree_C,PSU\n")
+        df.to_csv(f, index=False, header=False)
+
+def baseline(data):
+    """The single-worker fetch path: one pandas read, every value kept as text."""
+    import io
+    return pd.read_csv(io.BytesIO(data), skiprows=[1], dtype=str, keep_default_na=False)
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows in the synthetic CSV (default: 2000000)")
+    parser.add_argument("--file", help="Benchmark this ERDDAP CSV instead of a synthetic one")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts (default: 1,2,4,8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration; the best is reported (default: 3)")
+    args = parser.parse_args()
+
+    path = args.file
+    tmp = None
+    if not path:
+        tmp = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+        tmp.close()
+        path = tmp.name
+        print(f"Generating {args.rows:,} rows ...")
+        make_csv(path, args.rows)
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        print(f"CSV size: {len(data) / 1e6:.1f} MB, {os.cpu_count()} CPUs\n")
+
+        base, expected = timed(lambda: baseline(data), args.repeat)
+        print(f"{'configuration':<22}{'seconds':>10}{'MB/s':>10}{'speedup':>10}")
+        print(f"{'pd.read_csv':<22}{base:>10.2f}{len(data) / 1e6 / base:>10.1f}{1.0:>10.2f}")
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            elapsed, (df, _) = timed(lambda: read_csv_parallel(data, workers, min_chunk_bytes=1), args.repeat)
+            if not df.equals(expected):
+                print(f"warning: {workers} workers returned a different frame than the single read")
+            print(f"{f'parallel, {workers} workers':<22}{elapsed:>10.2f}{len(data) / 1e6 / elapsed:>10.1f}{base / elapsed:>10.2f}")
+    finally:
+        if tmp:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
+import sys
 import argparse
-from erddap_cli.commands.search import setup_search_command
-from erddap_cli.commands.servers import setup_servers_command
-from erddap_cli.commands.describe import setup_describe_command
-from erddap_cli.commands.fetch import setup_fetch_command
+from erddap_cli.commands.daemon import setup_daemon_command, forward_to_daemon
+
+def build_parser():
+    # Command modules pull in pandas/erddapy, so they are imported here rather
+    # than at module level to keep daemon-forwarded invocations fast.
+    from erddap_cli.commands.search import setup_search_command
+    from erddap_cli.commands.servers import setup_servers_command
+    from erddap_cli.commands.describe import setup_describe_command
+    from erddap_cli.commands.fetch import setup_fetch_command
+    from erddap_cli.commands.harvest import setup_harvest_command
+    from erddap_cli.commands.fanout import setup_fanout_command
+    from erddap_cli.commands.matchup import setup_matchup_command
+    from erddap_cli.commands.stats import setup_stats_command
 
-def main():
     parser = argparse.ArgumentParser(
         description="ERDDAP CLI - Query and download ERDDAP datasets from terminal."
     )
@@ -15,8 +24,22 @@ def main():
     setup_servers_command(subparsers)
     setup_describe_command(subparsers)
     setup_fetch_command(subparsers)
+    setup_harvest_command(subparsers)
+    setup_fanout_command(subparsers)
+    setup_matchup_command(subparsers)
+    setup_stats_command(subparsers)
+    setup_daemon_command(subparsers)
     # future commands setup here
 
+    return parser
+
+def main():
+    # Hand the command to a running daemon when possible, else run in-process
+    code = forward_to_daemon(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
+    parser = build_parser()
     args = parser.parse_args()
     args.func(args)
 
@@ -1 +1,3 @@
-
+from erddap_cli.client.api import ErddapClient, AsyncErddapClient
+from erddap_cli.client.lazy import open_griddap
+from erddap_cli.client.matchup import matchup_points
@@ -0,0 +1,238 @@
+import io
+import re
+import time
+import asyncio
+import threading
+import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from erddap_cli.client.session import (
+    HTTP_TIMEOUT,
+    INFO_CACHE_TTL,
+    build_search_url,
+    build_tabledap_url,
+    build_griddap_url,
+    parse_dataset_info,
+)
+from erddap_cli.client.journal import JournaledSession, record_cache_hit, cache_miss
+
+
+class ErddapClient:
+    """
+    Blocking, non-printing client for one ERDDAP server.
+
+    All calls share one pooled HTTP session and a dataset info cache, so a
+    single client can be reused across threads for many requests.
+    """
+
+    def __init__(self, server, timeout=HTTP_TIMEOUT, info_ttl=INFO_CACHE_TTL, pool_size=32, session=None):
+        self.server = server.rstrip('/')
+        self.timeout = timeout
+        self.info_ttl = info_ttl
+        if session is None:
+            session = JournaledSession()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._info_cache = {}
+        self._info_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, url, stream=False):
+        resp = self.session.get(url, timeout=self.timeout, stream=stream)
+        if not resp.ok:
+            resp.close()
+        resp.raise_for_status()
+        return resp
+
+    def _read_csv(self, url, **kwargs):
+        return pd.read_csv(io.BytesIO(self._get(url).content), **kwargs)
+
+    def search(self, query, page=1, items_per_page=25, **bounds):
+        """
+        Return one page of search results as records. bounds accepts the
+        min_lon/max_lon/min_lat/max_lat/min_time/max_time filters.
+        """
+        url = build_search_url(self.server, query, page, items_per_page, **bounds)
+        try:
+            df = self._read_csv(url)
+        except requests.HTTPError as e:
+            # ERDDAP answers 404 when nothing matches
+            if e.response is not None and e.response.status_code == 404:
+                return []
+            raise
+        return df.to_dict(orient="records")
+
+    def search_all(self, query, **bounds):
+        """Return every matching dataset in one request."""
+        return self.search(query, page=1, items_per_page=100000, **bounds)
+
+    def count(self, query, **bounds):
+        """Return the number of datasets matching the search."""
+        return len(self.search_all(query, **bounds))
+
+    def info(self, dataset_id):
+        """Return the dataset info dict (see session.get_dataset_info), cached per client."""
+        with self._info_lock:
+            cached = self._info_cache.get(dataset_id)
+        if cached and time.time() - cached[0] < self.info_ttl:
+            record_cache_hit(self.server, "info")
+            return cached[1]
+
+        with cache_miss():
+            info = parse_dataset_info(self.info_table(dataset_id), dataset_id)
+        with self._info_lock:
+            self._info_cache[dataset_id] = (time.time(), info)
+        return info
+
+    def info_table(self, dataset_id):
+        """Return the raw info CSV (Row Type, Variable Name, Attribute Name, Data Type, Value) uncached."""
+        url = f"{self.server}/info/{dataset_id}/index.csv"
+        return self._read_csv(url, comment='#', engine='python', skip_blank_lines=True)
+
+    def list_datasets(self):
+        """Return the IDs of every dataset the server lists."""
+        url = f"{self.server}/info/index.csv?page=1&itemsPerPage=1000000000"
+        df = self._read_csv(url)
+        return [did for did in df["Dataset ID"].dropna().astype(str) if did != "allDatasets"]
+
+    def categories(self, attribute):
+        """
+        Return {value: listing URL} for a categorize attribute such as
+        institution, cdm_data_type or standard_name.
+        """
+        url = f"{self.server}/categorize/{attribute}/index.csv?page=1&itemsPerPage=1000000000"
+        df = self._read_csv(url)
+        return {str(value): str(link) for value, link in zip(df["Category"], df["URL"])}
+
+    def category_datasets(self, url):
+        """Return the dataset IDs of one categorize listing, given its URL from categories()."""
+        # Listings are paged; ask for all of it as CSV whatever format the link names
+        url = re.sub(r"index\.\w+$", "index.csv", url.split("?", 1)[0]) + "?page=1&itemsPerPage=1000000000"
+        try:
+            df = self._read_csv(url)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return []
+            raise
+        return [did for did in df["Dataset ID"].dropna().astype(str) if did != "allDatasets"]
+
+    def tabledap_url(self, dataset_id, variables=None, constraints=None, filters=None, response_format="csv"):
+        return build_tabledap_url(self.server, dataset_id, variables, constraints, filters, response_format)
+
+    def griddap_url(self, dataset_id, variables, slices, response_format="csv"):
+        return build_griddap_url(self.server, dataset_id, variables, slices, response_format)
+
+    def iter_data(self, url, chunksize=100000):
+        """
+        Stream a .csv data response as DataFrames of up to chunksize rows,
+        without holding the whole response in memory. The units row is skipped.
+        """
+        with self._get(url, stream=True) as resp:
+            resp.raw.decode_content = True
+            try:
+                for chunk in pd.read_csv(resp.raw, skiprows=[1], chunksize=chunksize):
+                    yield chunk
+            except pd.errors.EmptyDataError:
+                return
+
+    def data(self, url):
+        """Download a .csv data response into one DataFrame (units row skipped)."""
+        chunks = list(self.iter_data(url))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+
+class AsyncErddapClient:
+    """
+    asyncio wrapper around ErddapClient.
+
+    Blocking requests run on a bounded thread pool whose size matches the HTTP
+    connection pool, so many concurrent awaits share a fixed set of keep-alive
+    connections. Concurrent info() calls for the same dataset share one request.
+    """
+
+    def __init__(self, server, max_concurrency=32, timeout=HTTP_TIMEOUT, info_ttl=INFO_CACHE_TTL):
+        self._client = ErddapClient(server, timeout=timeout, info_ttl=info_ttl, pool_size=max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="erddap")
+        self._pending_info = {}
+
+    @property
+    def server(self):
+        return self._client.server
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._client.close()
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def search(self, query, page=1, items_per_page=25, **bounds):
+        return await self._run(self._client.search, query, page, items_per_page, **bounds)
+
+    async def search_all(self, query, **bounds):
+        return await self._run(self._client.search_all, query, **bounds)
+
+    async def count(self, query, **bounds):
+        return await self._run(self._client.count, query, **bounds)
+
+    async def info(self, dataset_id):
+        pending = self._pending_info.get(dataset_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._run(self._client.info, dataset_id))
+            self._pending_info[dataset_id] = pending
+            pending.add_done_callback(lambda _: self._pending_info.pop(dataset_id, None))
+        return await asyncio.shield(pending)
+
+    async def info_table(self, dataset_id):
+        return await self._run(self._client.info_table, dataset_id)
+
+    async def list_datasets(self):
+        return await self._run(self._client.list_datasets)
+
+    async def categories(self, attribute):
+        return await self._run(self._client.categories, attribute)
+
+    async def category_datasets(self, url):
+        return await self._run(self._client.category_datasets, url)
+
+    def tabledap_url(self, dataset_id, variables=None, constraints=None, filters=None, response_format="csv"):
+        return self._client.tabledap_url(dataset_id, variables, constraints, filters, response_format)
+
+    def griddap_url(self, dataset_id, variables, slices, response_format="csv"):
+        return self._client.griddap_url(dataset_id, variables, slices, response_format)
+
+    async def iter_data(self, url, chunksize=100000):
+        """Async counterpart of ErddapClient.iter_data."""
+        chunks = self._client.iter_data(url, chunksize)
+        done = object()
+        try:
+            while True:
+                chunk = await self._run(next, chunks, done)
+                if chunk is done:
+                    break
+                yield chunk
+        finally:
+            await self._run(chunks.close)
+
+    async def data(self, url):
+        return await self._run(self._client.data, url)
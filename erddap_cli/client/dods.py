@@ -0,0 +1,190 @@
+import os
+import re
+import numpy as np
+from erddap_cli.client.session import get_http_session, build_griddap_url, HTTP_TIMEOUT
+
+# DAP2 atomic types -> big-endian XDR wire dtypes. Byte is packed one per
+# byte; 16-bit integers are widened to 32 bits on the wire.
+DAP_WIRE_DTYPES = {
+    "Byte":    ">u1",
+    "Int16":   ">i4",
+    "UInt16":  ">u4",
+    "Int32":   ">i4",
+    "UInt32":  ">u4",
+    "Float32": ">f4",
+    "Float64": ">f8",
+}
+# dtype the decoded arrays are exposed as
+DAP_DTYPES = {
+    "Byte":    "u1",
+    "Int16":   "i2",
+    "UInt16":  "u2",
+    "Int32":   "i4",
+    "UInt32":  "u4",
+    "Float32": "f4",
+    "Float64": "f8",
+}
+
+_DECL_RE = re.compile(r"^\s*(\w+)\s+([^\s\[;]+)((?:\s*\[[^\]]+\])*)\s*;", re.M)
+_DIM_RE = re.compile(r"\[\s*(?:(\w+)\s*=\s*)?(\d+)\s*\]")
+_SLICE_RE = re.compile(r"^\[\s*(\d+)\s*(?::\s*(\d+)\s*)?(?::\s*(\d+)\s*)?\]$")
+
+
+def parse_dds(text):
+    """
+    Parse a DAP2 DDS into a flat list of array declarations in wire order.
+    Each entry is a dict with name, type, dims, shape and the grid it belongs
+    to (None for plain arrays). Grid maps come right after their grid array.
+    """
+    decls = []
+    grid_stack = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("GRID"):
+            grid_stack.append(len(decls))
+            continue
+        if stripped.startswith("}") and grid_stack:
+            # "} sst;" closes a grid: tag the arrays declared inside it
+            grid_name = stripped.strip("}; ")
+            for decl in decls[grid_stack.pop():]:
+                decl["grid"] = grid_name
+            continue
+        m = _DECL_RE.match(line)
+        if not m or m.group(1) in ("Dataset", "Structure", "Sequence"):
+            continue
+        dap_type, name, dim_text = m.groups()
+        if dap_type not in DAP_WIRE_DTYPES:
+            raise ValueError(f"Unsupported DAP type {dap_type!r} for variable {name!r}.")
+        dims = _DIM_RE.findall(dim_text)
+        decls.append({
+            "name":  name,
+            "type":  dap_type,
+            "dims":  [d[0] or f"dim{i}" for i, d in enumerate(dims)],
+            "shape": tuple(int(d[1]) for d in dims),
+            "grid":  None,
+        })
+    return decls
+
+def split_dods(buffer):
+    """Split a .dods response into (DDS text, offset of the binary data)."""
+    marker = buffer.find(b"\nData:\n")
+    if marker < 0:
+        raise ValueError("Response is not a DAP2 .dods payload (no 'Data:' marker).")
+    return bytes(buffer[:marker]).decode("utf-8", errors="replace"), marker + len(b"\nData:\n")
+
+def decode_dods(buffer, out=None):
+    """
+    Decode a .dods payload into NumPy arrays keyed by variable name.
+
+    Float and 32-bit integer arrays are returned as read-only views on the
+    response buffer (no copy); other types are converted. When out maps a
+    name to a preallocated array (e.g. a region of a memmap), the values are
+    written there instead and that array is returned.
+    """
+    dds, offset = split_dods(buffer)
+    view = memoryview(buffer)
+    arrays = {}
+    for decl in parse_dds(dds):
+        count = int(np.prod(decl["shape"])) if decl["shape"] else 1
+        # XDR arrays carry their length twice before the values
+        length = int(np.frombuffer(view, ">u4", 1, offset)[0])
+        if length != count:
+            raise ValueError(f"Length mismatch for {decl['name']}: DDS says {count}, payload says {length}.")
+        offset += 8
+        wire = np.dtype(DAP_WIRE_DTYPES[decl["type"]])
+        values = np.frombuffer(view, wire, count, offset)
+        nbytes = count * wire.itemsize
+        offset += nbytes + (-nbytes % 4)  # Byte arrays are padded to 4 bytes
+
+        target = np.dtype(DAP_DTYPES[decl["type"]])
+        values = values.reshape(decl["shape"])
+        if target.itemsize != wire.itemsize:
+            values = values.astype(target)
+        name = decl["name"]
+        if name in arrays:
+            continue  # maps repeated by every grid in the request
+        if out is not None and name in out:
+            np.copyto(out[name], values, casting="unsafe")
+            arrays[name] = out[name]
+        else:
+            arrays[name] = values
+    return arrays
+
+def _server_message(resp):
+    m = re.search(r'message="(.*?)";?\s*$', resp.text, re.M | re.S)
+    return m.group(1) if m else f"HTTP {resp.status_code}"
+
+def _get_bytes(url):
+    resp = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Server Error: {_server_message(resp)}")
+    return resp.content
+
+def fetch_dds(server, dataset_id, variables, slices):
+    """Fetch only the DDS for a griddap request: names, dtypes and shapes, no data."""
+    text = _get_bytes(build_griddap_url(server, dataset_id, variables, slices, "dds")).decode("utf-8")
+    return parse_dds(text)
+
+def fetch_griddap_arrays(server, dataset_id, variables, slices, out=None):
+    """Request a griddap subset as .dods and decode it into NumPy arrays."""
+    url = build_griddap_url(server, dataset_id, variables, slices, "dods")
+    return decode_dods(_get_bytes(url), out)
+
+def parse_index_slice(text):
+    """Parse "[start:stride:stop]" index notation into (start, stride, stop), else None."""
+    m = _SLICE_RE.match(text.strip())
+    if not m:
+        return None
+    start = int(m.group(1))
+    if m.group(3) is not None:
+        return start, int(m.group(2)), int(m.group(3))
+    if m.group(2) is not None:
+        return start, 1, int(m.group(2))
+    return start, 1, start
+
+def fetch_griddap_to_memmap(server, dataset_id, variables, slices, output_dir, tile_size=10, progress=None):
+    """
+    Assemble a griddap subset into .npy memmaps (one per variable and axis)
+    under output_dir, fetching tile_size steps of the first dimension per
+    request so the result never has to fit in memory. Value-based
+    "[(a):s:(b)]" slices on the first dimension are fetched in one request.
+    Returns a dict of name -> np.memmap.
+    """
+    decls = fetch_dds(server, dataset_id, variables, slices)
+    os.makedirs(output_dir, exist_ok=True)
+    memmaps = {}
+    for decl in decls:
+        if decl["name"] not in memmaps:
+            path = os.path.join(output_dir, f"{decl['name']}.npy")
+            memmaps[decl["name"]] = np.lib.format.open_memmap(
+                path, mode="w+", dtype=DAP_DTYPES[decl["type"]], shape=decl["shape"]
+            )
+
+    first = parse_index_slice(slices[0]) if slices else None
+    if first is None or tile_size <= 0:
+        fetch_griddap_arrays(server, dataset_id, variables, slices, out=memmaps)
+    else:
+        start, stride, stop = first
+        first_dim = next((d["dims"][0] for d in decls if d["grid"] and d["dims"]), None)
+        if first_dim is None and decls and decls[0]["dims"]:
+            first_dim = decls[0]["dims"][0]  # axis-only request
+        steps = (stop - start) // stride + 1
+        for i0 in range(0, steps, tile_size):
+            i1 = min(i0 + tile_size, steps)
+            tile_slices = [f"[{start + i0 * stride}:{stride}:{start + (i1 - 1) * stride}]"] + list(slices[1:])
+            # Arrays indexed by the first dimension get the tile's rows; the
+            # other axes are identical in every tile and written each time.
+            out = {}
+            for decl in decls:
+                target = memmaps[decl["name"]]
+                if decl["dims"] and decl["dims"][0] == first_dim:
+                    out[decl["name"]] = target[i0:i1]
+                else:
+                    out[decl["name"]] = target
+            fetch_griddap_arrays(server, dataset_id, variables, tile_slices, out=out)
+            if progress:
+                progress(i1, steps)
+
+    for mm in memmaps.values():
+        mm.flush()
+    return memmaps
@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Each counted value costs one /categorize/ listing request, so facets with
+# more values than this (standard_name, keywords on large servers) are skipped.
+DEFAULT_MAX_VALUES = 100
+# Facets that can be counted from the columns of search result rows instead
+ROW_COLUMNS = {"institution": "Institution"}
+
+
+def is_restrictive(query, **bounds):
+    """True when a search narrows the catalog, so facet counts must be intersected with it."""
+    return (query or "").strip().lower() not in ("", "*", "all") or any(v is not None for v in bounds.values())
+
+def count_rows(rows, column):
+    """Count search result rows per value of column, most frequent first."""
+    counts = {}
+    for row in rows:
+        value = row.get(column)
+        if value is None or value != value or str(value).strip() == "":
+            continue
+        counts[str(value)] = counts.get(str(value), 0) + 1
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+def facet_counts(client, facets, dataset_ids=None, workers=16, max_values=DEFAULT_MAX_VALUES, rows=None):
+    """
+    Count datasets per value of each categorize attribute in facets.
+
+    Each facet's value list costs one request, and counting each value costs
+    one more (its dataset listing), so facets with more than max_values values
+    are not counted and report their number of values as "skipped". When rows
+    (the full search result, one dict per dataset) are given, facets in
+    ROW_COLUMNS are counted from them with no requests at all, and dataset_ids
+    restricts the other counts to the datasets the search matched.
+    Returns {facet: {"values": [(value, count), ...] most frequent first,
+    "skipped": number of values or None, "error": message or None}}.
+    """
+    wanted = None if dataset_ids is None else set(dataset_ids)
+    results = {facet: {"values": [], "skipped": None, "error": None} for facet in facets}
+    remote = []
+    for facet in facets:
+        if rows is not None and facet in ROW_COLUMNS:
+            results[facet]["values"] = count_rows(rows, ROW_COLUMNS[facet])
+        else:
+            remote.append(facet)
+    if not remote or (wanted is not None and not wanted):
+        return results
+
+    counts = {facet: {} for facet in remote}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        value_futures = {pool.submit(client.categories, facet): facet for facet in remote}
+        listing_futures = {}
+        for future in as_completed(value_futures):
+            facet = value_futures[future]
+            try:
+                values = future.result()
+            except Exception as e:
+                results[facet]["error"] = str(e)
+                continue
+            if max_values is not None and len(values) > max_values:
+                results[facet]["skipped"] = len(values)
+                continue
+            for value, url in values.items():
+                listing_futures[pool.submit(client.category_datasets, url)] = (facet, value)
+
+        for future in as_completed(listing_futures):
+            facet, value = listing_futures[future]
+            try:
+                ids = future.result()
+            except Exception as e:
+                results[facet]["error"] = f"{value}: {e}"
+                continue
+            count = len(ids) if wanted is None else len(wanted.intersection(ids))
+            if count:
+                counts[facet][value] = count
+
+    for facet in remote:
+        results[facet]["values"] = sorted(counts[facet].items(), key=lambda item: (-item[1], item[0]))
+    return results
@@ -0,0 +1,193 @@
+import os
+import time
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from erddap_cli.client.api import ErddapClient
+from erddap_cli.client.session import parse_dataset_info
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    server        TEXT NOT NULL,
+    dataset_id    TEXT NOT NULL,
+    title         TEXT,
+    institution   TEXT,
+    cdm_data_type TEXT,
+    time_start    TEXT,
+    time_end      TEXT,
+    min_lon       REAL,
+    max_lon       REAL,
+    min_lat       REAL,
+    max_lat       REAL,
+    harvested     REAL,
+    PRIMARY KEY (server, dataset_id)
+);
+CREATE TABLE IF NOT EXISTS variables (
+    server        TEXT NOT NULL,
+    dataset_id    TEXT NOT NULL,
+    name          TEXT NOT NULL,
+    kind          TEXT NOT NULL,
+    data_type     TEXT,
+    units         TEXT,
+    standard_name TEXT,
+    long_name     TEXT,
+    min_value     REAL,
+    max_value     REAL,
+    nvalues       INTEGER
+);
+CREATE TABLE IF NOT EXISTS attributes (
+    server        TEXT NOT NULL,
+    dataset_id    TEXT NOT NULL,
+    variable      TEXT NOT NULL,
+    name          TEXT NOT NULL,
+    data_type     TEXT,
+    value         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_variables_standard_name ON variables (standard_name);
+CREATE INDEX IF NOT EXISTS idx_variables_name ON variables (name);
+CREATE INDEX IF NOT EXISTS idx_variables_units ON variables (units);
+CREATE INDEX IF NOT EXISTS idx_variables_dataset ON variables (server, dataset_id);
+CREATE INDEX IF NOT EXISTS idx_attributes_dataset ON attributes (server, dataset_id);
+"""
+
+
+def get_index_path():
+    return os.path.expanduser("~/.erddap_cli_index.sqlite")
+
+def open_index(path=None):
+    conn = sqlite3.connect(path or get_index_path())
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def _to_float(val):
+    try:
+        return float(str(val).strip().rstrip(','))
+    except (ValueError, TypeError):
+        return None
+
+def _store_dataset(conn, server, dataset_id, table):
+    """Replace everything stored for one dataset with a freshly parsed info table."""
+    info = parse_dataset_info(table, dataset_id)
+    attrs = info["global_attrs"]
+    table = table.fillna('')
+
+    conn.execute("DELETE FROM datasets WHERE server = ? AND dataset_id = ?", (server, dataset_id))
+    conn.execute("DELETE FROM variables WHERE server = ? AND dataset_id = ?", (server, dataset_id))
+    conn.execute("DELETE FROM attributes WHERE server = ? AND dataset_id = ?", (server, dataset_id))
+
+    conn.execute(
+        "INSERT INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            server, dataset_id, info["title"], info["institution"], info["cdm_data_type"],
+            info["time_coverage_start"], info["time_coverage_end"],
+            _to_float(attrs.get("geospatial_lon_min", info["wmost_easting"])),
+            _to_float(attrs.get("geospatial_lon_max", info["emost_easting"])),
+            _to_float(attrs.get("geospatial_lat_min", info["smost_northing"])),
+            _to_float(attrs.get("geospatial_lat_max", info["nmost_northing"])),
+            time.time(),
+        ),
+    )
+
+    data_types = {
+        row["Variable Name"]: row["Data Type"]
+        for _, row in table[table["Row Type"] == "variable"].iterrows()
+    }
+    rows = []
+    for kind, items in (("dimension", info["dimensions"]), ("variable", info["variables"])):
+        for item in items:
+            rows.append((
+                server, dataset_id, item["name"], kind,
+                item.get("data_type") or data_types.get(item["name"], ''),
+                item.get("units", ''), item.get("standard_name", ''), item.get("long_name", ''),
+                _to_float(item.get("min")), _to_float(item.get("max")), item.get("nvalues"),
+            ))
+    conn.executemany("INSERT INTO variables VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    attr_rows = table[table["Row Type"] == "attribute"]
+    conn.executemany(
+        "INSERT INTO attributes VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (server, dataset_id, r["Variable Name"], r["Attribute Name"], r["Data Type"], str(r["Value"]))
+            for _, r in attr_rows.iterrows()
+        ],
+    )
+
+def harvest_server(server, conn, workers=16, progress=None):
+    """
+    Fetch the info table of every dataset on a server concurrently and store
+    them in the index. Failures are isolated per dataset.
+    Returns (stored, failed) where failed is a list of (dataset_id, error).
+    """
+    server = server.rstrip('/')
+    stored, failed = 0, []
+    with ErddapClient(server, pool_size=workers) as client:
+        dataset_ids = client.list_datasets()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(client.info_table, did): did for did in dataset_ids}
+            # Writes stay on this thread; sqlite connections are not shared
+            for n, future in enumerate(as_completed(futures), 1):
+                did = futures[future]
+                try:
+                    _store_dataset(conn, server, did, future.result())
+                    stored += 1
+                except Exception as err:
+                    failed.append((did, err))
+                if progress:
+                    progress(n, len(dataset_ids))
+                if n % 100 == 0:
+                    conn.commit()
+    conn.commit()
+    return stored, failed
+
+def query_index(conn, standard_name=None, units=None, variable=None, server=None,
+                min_lon=None, max_lon=None, min_lat=None, max_lat=None,
+                min_time=None, max_time=None, value_min=None, value_max=None):
+    """
+    Find variables in the index. Text filters accept * wildcards. The bbox and
+    time filters match datasets whose coverage overlaps; value_min/value_max
+    match variables whose actual_range overlaps.
+    """
+    sql = [
+        "SELECT v.server, v.dataset_id, v.name, v.kind, v.units, v.standard_name,",
+        "       v.min_value, v.max_value, d.title",
+        "FROM variables v JOIN datasets d ON d.server = v.server AND d.dataset_id = v.dataset_id",
+        "WHERE 1 = 1",
+    ]
+    params = []
+
+    def like(column, value):
+        sql.append(f"AND {column} LIKE ?")
+        params.append(value.replace('*', '%'))
+
+    if standard_name:
+        like("v.standard_name", standard_name)
+    if units:
+        like("v.units", units)
+    if variable:
+        like("v.name", variable)
+    if server:
+        sql.append("AND v.server = ?")
+        params.append(server.rstrip('/'))
+    # Overlap tests: datasets with unknown bounds are kept
+    for column, op, value in (
+        ("d.max_lon", ">=", min_lon), ("d.min_lon", "<=", max_lon),
+        ("d.max_lat", ">=", min_lat), ("d.min_lat", "<=", max_lat),
+        ("d.time_end", ">=", min_time), ("d.time_start", "<=", max_time),
+        ("v.max_value", ">=", value_min), ("v.min_value", "<=", value_max),
+    ):
+        if value is not None:
+            sql.append(f"AND ({column} IS NULL OR {column} = '' OR {column} {op} ?)")
+            params.append(value)
+    sql.append("ORDER BY v.server, v.dataset_id, v.name")
+    return [dict(row) for row in conn.execute("\n".join(sql), params)]
+
+def index_summary(conn):
+    """Return (server, datasets, variables, last harvest time) per server."""
+    return [
+        dict(row) for row in conn.execute(
+            "SELECT d.server, COUNT(DISTINCT d.dataset_id) AS datasets,"
+            " (SELECT COUNT(*) FROM variables v WHERE v.server = d.server) AS variables,"
+            " MAX(d.harvested) AS harvested "
+            "FROM datasets d GROUP BY d.server ORDER BY d.server"
+        )
+    ]
@@ -0,0 +1,243 @@
+import os
+import time
+import atexit
+import sqlite3
+import threading
+import contextlib
+import requests
+import numpy as np
+from urllib.parse import urlsplit
+
+# Rows are buffered in memory and written in batches, at the latest after
+# FLUSH_INTERVAL seconds or FLUSH_ROWS rows, and when the process exits.
+FLUSH_INTERVAL = 5.0
+FLUSH_ROWS = 100
+PERCENTILES = (50, 95, 99)
+
+# Path segments that start an ERDDAP service; everything before is the server
+_SERVICES = {"info", "search", "tabledap", "griddap", "categorize", "files", "wms", "version", "index.html"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    ts        REAL NOT NULL,
+    server    TEXT NOT NULL,
+    endpoint  TEXT NOT NULL,
+    method    TEXT,
+    status    INTEGER,
+    error     TEXT,
+    ttfb_ms   REAL,
+    total_ms  REAL,
+    bytes     INTEGER,
+    cache     TEXT
+);
+CREATE INDEX IF NOT EXISTS requests_server ON requests (server, endpoint, ts);
+"""
+
+_buffer = []
+_lock = threading.Lock()
+_last_flush = time.time()
+_local = threading.local()
+
+
+def get_journal_path():
+    return os.path.expanduser("~/.erddap_cli_journal.sqlite")
+
+def journal_enabled():
+    """The journal is on unless ERDDAP_CLI_JOURNAL is set to 0/off/false."""
+    return os.environ.get("ERDDAP_CLI_JOURNAL", "").lower() not in ("0", "off", "false", "no")
+
+def open_journal(path=None):
+    conn = sqlite3.connect(path or get_journal_path())
+    conn.executescript(SCHEMA)
+    return conn
+
+def split_url(url):
+    """Split a request URL into (server, endpoint), e.g. ("https://host/erddap", "tabledap.csv")."""
+    parts = urlsplit(url)
+    segments = parts.path.split("/")
+    base = f"{parts.scheme}://{parts.netloc}"
+    for i, segment in enumerate(segments):
+        if segment in _SERVICES:
+            endpoint = segment.replace(".html", "")
+            if segment in ("tabledap", "griddap") and i + 1 < len(segments) and "." in segments[i + 1]:
+                endpoint += "." + segments[i + 1].rsplit(".", 1)[1]
+            return base + "/".join(segments[:i]), endpoint
+    return base + parts.path.rstrip("/"), "other"
+
+def flush(path=None):
+    """Write buffered rows to the journal."""
+    global _last_flush
+    with _lock:
+        rows = list(_buffer)
+        _buffer.clear()
+        _last_flush = time.time()
+    if not rows:
+        return
+    try:
+        conn = open_journal(path)
+        try:
+            with conn:
+                conn.executemany("INSERT INTO requests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass  # the journal must never break a request
+
+atexit.register(flush)
+
+def record(url=None, server=None, endpoint=None, method="GET", status=None, error=None,
+           ttfb=None, total=None, nbytes=None, cache=None):
+    """Add one entry. Times are in seconds; url is split into server and endpoint when given."""
+    if not journal_enabled():
+        return
+    if url is not None:
+        server, endpoint = split_url(url)
+    if cache is None:
+        cache = getattr(_local, "cache", None)
+    row = (
+        time.time(), server, endpoint, method, status, error,
+        None if ttfb is None else ttfb * 1000, None if total is None else total * 1000, nbytes, cache,
+    )
+    with _lock:
+        _buffer.append(row)
+        due = len(_buffer) >= FLUSH_ROWS or time.time() - _last_flush >= FLUSH_INTERVAL
+    if due:
+        flush()
+
+def record_cache_hit(server, endpoint):
+    """Record a lookup answered from a local cache, without any HTTP request."""
+    record(server=server.rstrip('/'), endpoint=endpoint, method=None, total=0.0, cache="hit")
+
+@contextlib.contextmanager
+def cache_miss():
+    """Mark the requests made inside the block (in this thread) as cache misses."""
+    previous = getattr(_local, "cache", None)
+    _local.cache = "miss"
+    try:
+        yield
+    finally:
+        _local.cache = previous
+
+
+class JournaledSession(requests.Session):
+    """
+    requests.Session that records every request in the journal: time to
+    first byte, total time including the body, bytes and status. Streamed
+    responses are recorded when they are closed, or at once for non-2xx.
+    """
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        cache = getattr(_local, "cache", None)
+        try:
+            resp = super().send(request, **kwargs)
+        except requests.RequestException as e:
+            record(request.url, method=request.method, error=type(e).__name__,
+                   total=time.perf_counter() - start, cache=cache)
+            raise
+        ttfb = resp.elapsed.total_seconds()
+
+        if not kwargs.get("stream"):
+            record(request.url, method=request.method, status=resp.status_code, ttfb=ttfb,
+                   total=time.perf_counter() - start, nbytes=len(resp.content), cache=cache)
+            return resp
+
+        if not resp.ok:
+            # Error responses are often raised on without ever being closed,
+            # so record them now rather than on close.
+            resp._journaled = True
+            record(request.url, method=request.method, status=resp.status_code, ttfb=ttfb,
+                   total=time.perf_counter() - start, cache=cache)
+            return resp
+
+        close = resp.close
+        def close_and_record():
+            if not getattr(resp, "_journaled", False):
+                resp._journaled = True
+                nbytes = resp.raw.tell() if hasattr(resp.raw, "tell") else None
+                record(request.url, method=request.method, status=resp.status_code, ttfb=ttfb,
+                       total=time.perf_counter() - start, nbytes=nbytes, cache=cache)
+            close()
+        resp.close = close_and_record
+        return resp
+
+
+def journal_stats(conn, server=None, endpoint=None, since=None):
+    """
+    Per (server, endpoint) request statistics: counts, error rate,
+    p50/p95/p99 total and first-byte latency (ms), bytes, throughput (MB/s
+    over the time spent in requests) and cache hits/misses.
+    """
+    sql = "SELECT server, endpoint, status, error, ttfb_ms, total_ms, bytes, cache FROM requests WHERE 1=1"
+    params = []
+    if server:
+        sql += " AND server = ?"
+        params.append(server.rstrip('/'))
+    if endpoint:
+        sql += " AND endpoint = ?"
+        params.append(endpoint)
+    if since is not None:
+        sql += " AND ts >= ?"
+        params.append(since)
+
+    groups = {}
+    for row in conn.execute(sql, params):
+        groups.setdefault((row[0], row[1]), []).append(row[2:])
+
+    stats = []
+    for (srv, ep), rows in sorted(groups.items()):
+        http = [r for r in rows if r[5] != "hit"]
+        errors = sum(1 for status, error, *_ in http if error or (status or 0) >= 400)
+        total = np.array([r[3] for r in http if r[3] is not None], dtype=float)
+        ttfb = np.array([r[2] for r in http if r[2] is not None], dtype=float)
+        nbytes = sum(r[4] or 0 for r in http)
+        seconds = total.sum() / 1000 if len(total) else 0.0
+        entry = {
+            "server":      srv,
+            "endpoint":    ep,
+            "requests":    len(http),
+            "errors":      errors,
+            "error_rate":  errors / len(http) if http else 0.0,
+            "bytes":       nbytes,
+            "throughput":  nbytes / 1e6 / seconds if seconds else None,
+            "cache_hits":  sum(1 for r in rows if r[5] == "hit"),
+            "cache_misses": sum(1 for r in rows if r[5] == "miss"),
+        }
+        for p in PERCENTILES:
+            entry[f"p{p}_ms"] = float(np.percentile(total, p)) if len(total) else None
+            entry[f"ttfb_p{p}_ms"] = float(np.percentile(ttfb, p)) if len(ttfb) else None
+        stats.append(entry)
+    return stats
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(stats):
+    """Render journal_stats output in the Prometheus text exposition format."""
+    metrics = [
+        ("erddap_cli_requests_total",      "counter", "HTTP requests made", "requests"),
+        ("erddap_cli_request_errors_total", "counter", "Requests that failed or returned HTTP >= 400", "errors"),
+        ("erddap_cli_response_bytes_total", "counter", "Response bytes received", "bytes"),
+        ("erddap_cli_cache_hits_total",    "counter", "Lookups answered from a local cache", "cache_hits"),
+        ("erddap_cli_cache_misses_total",  "counter", "Requests made after a local cache miss", "cache_misses"),
+    ]
+    lines = []
+    for name, kind, help_text, key in metrics:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for s in stats:
+            lines.append(f'{name}{{server="{_label(s["server"])}",endpoint="{_label(s["endpoint"])}"}} {s[key]}')
+
+    for name, prefix, help_text in (
+        ("erddap_cli_request_duration_seconds", "p", "Total request time including the body"),
+        ("erddap_cli_time_to_first_byte_seconds", "ttfb_p", "Time until the response headers arrived"),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for s in stats:
+            for p in PERCENTILES:
+                value = s[f"{prefix}{p}_ms"]
+                if value is not None:
+                    lines.append(
+                        f'{name}{{server="{_label(s["server"])}",endpoint="{_label(s["endpoint"])}",'
+                        f'quantile="{p / 100:g}"}} {value / 1000:.6f}'
+                    )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,304 @@
+import os
+import hashlib
+import itertools
+import threading
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from erddap_cli.client.session import get_dataset_info
+from erddap_cli.client.dods import fetch_griddap_arrays
+from erddap_cli.client.journal import record_cache_hit, cache_miss
+
+# Default chunk edge for the two trailing (usually lat/lon) dimensions;
+# leading dimensions (time, depth, ...) are chunked one step at a time.
+DEFAULT_SPATIAL_CHUNK = 256
+DEFAULT_MEMORY_CHUNKS = 256
+DEFAULT_DISK_BYTES = 2 * 1024 ** 3
+
+
+def get_chunk_cache_dir():
+    return os.path.expanduser("~/.erddap_cli_chunks")
+
+
+class ChunkCache:
+    """
+    Two-level cache for griddap chunks: an in-memory LRU of up to max_chunks
+    arrays in front of .npy files on disk, themselves kept under max_disk_bytes
+    by evicting the least recently used files (by modification time, which
+    is refreshed on every disk hit).
+    """
+
+    def __init__(self, cache_dir=None, max_chunks=DEFAULT_MEMORY_CHUNKS, max_disk_bytes=DEFAULT_DISK_BYTES):
+        self.cache_dir = cache_dir if cache_dir is not None else get_chunk_cache_dir()
+        self.max_chunks = max_chunks
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        namespace, index = key
+        return os.path.join(self.cache_dir, namespace, "_".join(map(str, index)) + ".npy")
+
+    def get(self, key, shape=None):
+        """Cached chunk for key, or None; a chunk whose shape differs from shape counts as a miss."""
+        with self._lock:
+            arr = self._memory.get(key)
+            if arr is not None and (shape is None or arr.shape == shape):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return arr
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                arr = np.load(path)
+            except (OSError, ValueError):
+                arr = None
+            if arr is not None and (shape is None or arr.shape == shape):
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._remember(key, arr)
+                with self._lock:
+                    self.hits += 1
+                return arr
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, arr):
+        if self.cache_dir:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + f".{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+            self._account(size)
+        self._remember(key, arr)
+
+    def _scan(self):
+        """(mtime, size, path) of every cached chunk file."""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".npy"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _account(self, size):
+        """Track bytes on disk and evict the oldest chunk files once over max_disk_bytes."""
+        if not self.max_disk_bytes:
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(f[1] for f in self._scan())
+            else:
+                self._disk_bytes += size
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            # Other processes share the directory, so rescan before evicting
+            files = sorted(self._scan())
+            total = sum(f[1] for f in files)
+            target = self.max_disk_bytes * 0.9
+            for _, file_size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= file_size
+            self._disk_bytes = total
+
+    def _remember(self, key, arr):
+        with self._lock:
+            self._memory[key] = arr
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_chunks:
+                self._memory.popitem(last=False)
+
+
+class LazyGridArray:
+    """
+    Array-like view of one griddap variable. Indexing with ints and slices
+    fetches only the chunks that overlap the selection, concurrently, and
+    returns a NumPy array. Nothing is downloaded until it is indexed.
+    """
+
+    def __init__(self, dataset, name):
+        self.dataset = dataset
+        self.name = name
+        self.dims = [d["name"] for d in dataset.dimensions]
+        self.shape = tuple(int(d["nvalues"]) for d in dataset.dimensions)
+        self.chunks = dataset.chunks
+        # Rolling near-real-time grids shift what an index means as they grow
+        # or drop old steps, so the sizes and current extent of every dimension
+        # are part of the key; a changed dataset gets a fresh namespace.
+        extent = [(d["name"], d.get("nvalues"), d.get("min"), d.get("max")) for d in dataset.dimensions]
+        version = dataset.info.get("global_attrs", {}).get("time_coverage_end", "")
+        key = f"{dataset.server}|{dataset.dataset_id}|{name}|{self.chunks}|{extent}|{version}"
+        self._namespace = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __repr__(self):
+        dims = ", ".join(f"{d}: {n}" for d, n in zip(self.dims, self.shape))
+        return f"<LazyGridArray {self.dataset.dataset_id}.{self.name} ({dims}) chunks={self.chunks}>"
+
+    def _normalize(self, key):
+        """Expand key into one (indices, squeeze) pair per dimension."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+        if len(key) > self.ndim:
+            raise IndexError(f"Too many indices: {self.name} has {self.ndim} dimensions.")
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        out = []
+        for k, n, dim in zip(key, self.shape, self.dims):
+            if isinstance(k, slice):
+                out.append((np.arange(*k.indices(n)), False))
+            elif isinstance(k, (int, np.integer)):
+                idx = int(k) + n if k < 0 else int(k)
+                if not 0 <= idx < n:
+                    raise IndexError(f"Index {k} out of range for dimension {dim} of size {n}.")
+                out.append((np.array([idx]), True))
+            else:
+                raise TypeError(f"Unsupported index {k!r}; use ints and slices.")
+        return out
+
+    def _chunk_shape(self, index):
+        return tuple(min(c, n - i * c) for i, c, n in zip(index, self.chunks, self.shape))
+
+    def _fetch_chunk(self, index):
+        cache = self.dataset.cache
+        key = (self._namespace, index)
+        expected = self._chunk_shape(index)
+        arr = cache.get(key, expected)
+        if arr is not None:
+            record_cache_hit(self.dataset.server, "griddap.dods")
+            return arr
+        slices = []
+        for i, c, n in zip(index, self.chunks, self.shape):
+            start = i * c
+            stop = min(start + c, n) - 1
+            slices.append(f"[{start}:1:{stop}]")
+        with cache_miss():
+            raw = fetch_griddap_arrays(self.dataset.server, self.dataset.dataset_id, [self.name], slices)[self.name]
+        arr = np.ascontiguousarray(raw, dtype=raw.dtype.newbyteorder("="))
+        if arr.shape != expected:
+            raise ValueError(f"Server returned a {arr.shape} chunk of {self.name} where {expected} was expected.")
+        cache.put(key, arr)
+        return arr
+
+    def __getitem__(self, key):
+        selection = self._normalize(key)
+        if any(len(idx) == 0 for idx, _ in selection):
+            shape = tuple(len(idx) for idx, squeeze in selection if not squeeze)
+            return np.empty(shape)
+
+        lows = [int(idx.min()) for idx, _ in selection]
+        highs = [int(idx.max()) for idx, _ in selection]
+        chunk_ranges = [range(lo // c, hi // c + 1) for lo, hi, c in zip(lows, highs, self.chunks)]
+        chunk_ids = list(itertools.product(*chunk_ranges))
+
+        fetched = dict(zip(chunk_ids, self.dataset.pool.map(self._fetch_chunk, chunk_ids)))
+
+        # Copy the overlapping part of every chunk into the bounding box
+        block = None
+        for index, arr in fetched.items():
+            if block is None:
+                block = np.empty([hi - lo + 1 for lo, hi in zip(lows, highs)], dtype=arr.dtype)
+            src, dst = [], []
+            for axis, (i, c, lo, hi) in enumerate(zip(index, self.chunks, lows, highs)):
+                c0 = i * c
+                a, b = max(lo, c0), min(hi, c0 + arr.shape[axis] - 1)
+                src.append(slice(a - c0, b - c0 + 1))
+                dst.append(slice(a - lo, b - lo + 1))
+            block[tuple(dst)] = arr[tuple(src)]
+
+        result = block[np.ix_(*[idx - lo for (idx, _), lo in zip(selection, lows)])]
+        squeeze_axes = tuple(i for i, (_, squeeze) in enumerate(selection) if squeeze)
+        return result.squeeze(axis=squeeze_axes) if squeeze_axes else result
+
+
+class LazyGridDataset:
+    """
+    Lazy handle on a griddap dataset built from get_dataset_info dimensions.
+    ds["sst"] gives a LazyGridArray; ds.axis("time") the coordinate values.
+    """
+
+    def __init__(self, server, dataset_id, chunks=None, cache=None, workers=8, info=None):
+        self.server = server.rstrip('/')
+        self.dataset_id = dataset_id
+        info = info or get_dataset_info(self.server, dataset_id)
+        self.info = info
+        self.dimensions = info.get("dimensions", [])
+        if not self.dimensions or any(not d.get("nvalues") for d in self.dimensions):
+            raise ValueError(f"{dataset_id} has no griddap dimensions with known sizes.")
+        dim_names = {d["name"] for d in self.dimensions}
+        self.variables = [v["name"] for v in info.get("variables", []) if v["name"] not in dim_names]
+
+        shape = [int(d["nvalues"]) for d in self.dimensions]
+        if chunks is None:
+            chunks = [1] * len(shape)
+            for i in range(max(0, len(shape) - 2), len(shape)):
+                chunks[i] = DEFAULT_SPATIAL_CHUNK
+        if len(chunks) != len(shape):
+            raise ValueError(f"chunks needs {len(shape)} entries, one per dimension.")
+        self.chunks = tuple(max(1, min(int(c), n)) for c, n in zip(chunks, shape))
+        self.cache = cache if cache is not None else ChunkCache()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="erddap-chunk")
+        self._axes = {}
+
+    def __getitem__(self, name):
+        if name not in self.variables:
+            raise KeyError(f"{name!r} is not a data variable of {self.dataset_id}.")
+        return LazyGridArray(self, name)
+
+    def __repr__(self):
+        dims = ", ".join(f"{d['name']}: {d['nvalues']}" for d in self.dimensions)
+        return f"<LazyGridDataset {self.dataset_id} ({dims}) variables={self.variables}>"
+
+    def axis(self, name):
+        """Coordinate values of a dimension, fetched once as binary."""
+        if name not in self._axes:
+            dim = next((d for d in self.dimensions if d["name"] == name), None)
+            if dim is None:
+                raise KeyError(f"{name!r} is not a dimension of {self.dataset_id}.")
+            arr = fetch_griddap_arrays(self.server, self.dataset_id, [name], [f"[0:1:{int(dim['nvalues']) - 1}]"])[name]
+            self._axes[name] = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("="))
+        return self._axes[name]
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def open_griddap(server, dataset_id, chunks=None, cache_dir=None, max_memory_chunks=DEFAULT_MEMORY_CHUNKS,
+                 max_disk_bytes=DEFAULT_DISK_BYTES, workers=8):
+    """
+    Open a griddap dataset for lazy, chunked array access:
+
+        ds = open_griddap(server, "erdMH1sstd8day")
+        sst = ds["sst"][0:10, 1000:1200, 2000:2300]
+
+    Chunks are cached in memory (LRU) and under cache_dir on disk
+    (default ~/.erddap_cli_chunks, least recently used files evicted past
+    max_disk_bytes); pass cache_dir="" to keep them in memory only.
+    """
+    cache = ChunkCache(cache_dir, max_memory_chunks, max_disk_bytes)
+    return LazyGridDataset(server, dataset_id, chunks=chunks, cache=cache, workers=workers)
@@ -0,0 +1,205 @@
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from erddap_cli.client.session import get_dataset_info
+from erddap_cli.client.dods import fetch_griddap_arrays
+
+# Box edge, in grid steps, for the two trailing (usually lat/lon) dimensions
+# and for the leading ones (time, depth, ...). Points are binned into tiles of
+# this size and each tile is fetched as the tight index box around its points.
+DEFAULT_SPATIAL_TILE = 32
+DEFAULT_LEADING_TILE = 8
+METHODS = ("nearest", "linear")
+
+
+def _is_time_dim(dim):
+    return dim["name"] == "time" or "since" in (dim.get("units") or "")
+
+def _is_lon_dim(dim):
+    return dim["name"].lower() in ("longitude", "lon")
+
+def to_axis_values(dim, values):
+    """Convert point coordinates to the units of a griddap axis (epoch seconds for time)."""
+    if _is_time_dim(dim) and not pd.api.types.is_numeric_dtype(values):
+        ts = pd.to_datetime(values, utc=True, errors="coerce")
+        return ((ts - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+
+def fetch_axes(server, dataset_id, dimensions, workers=8):
+    """Fetch the coordinate values of every dimension as binary, concurrently."""
+    def fetch(dim):
+        arr = fetch_griddap_arrays(server, dataset_id, [dim["name"]], [f"[0:1:{int(dim['nvalues']) - 1}]"])[dim["name"]]
+        return np.asarray(arr, dtype=float)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip([d["name"] for d in dimensions], pool.map(fetch, dimensions)))
+
+def locate(axis, values, method="nearest"):
+    """
+    Vectorized position of values on a monotonic axis.
+    Returns (i0, i1, weight, inside): the value is (1 - weight) * f[i0] + weight * f[i1]
+    (i0 == i1 and weight 0 for nearest), and inside is False for points more
+    than half a step beyond either end of the axis.
+    """
+    n = len(axis)
+    values = np.asarray(values, dtype=float)
+    if n == 1:
+        zeros = np.zeros(len(values), dtype=np.intp)
+        return zeros, zeros, np.zeros(len(values)), ~np.isnan(values)
+
+    descending = axis[0] > axis[-1]
+    a = axis[::-1] if descending else axis
+    tol_lo, tol_hi = (a[1] - a[0]) / 2, (a[-1] - a[-2]) / 2
+    inside = (values >= a[0] - tol_lo) & (values <= a[-1] + tol_hi)
+
+    if method == "nearest":
+        j = np.clip(np.searchsorted(a, values), 1, n - 1)
+        i = np.where(values - a[j - 1] <= a[j] - values, j - 1, j)
+        i0 = i1 = i
+        weight = np.zeros(len(values))
+    else:
+        i0 = np.clip(np.searchsorted(a, values, side="right") - 1, 0, n - 2)
+        i1 = i0 + 1
+        with np.errstate(invalid="ignore"):
+            weight = np.clip((values - a[i0]) / (a[i1] - a[i0]), 0.0, 1.0)
+
+    if descending:
+        i0, i1 = n - 1 - i0, n - 1 - i1
+    weight = np.where(inside, weight, 0.0)
+    return i0.astype(np.intp), i1.astype(np.intp), weight, inside
+
+def plan_boxes(lows, highs, tile):
+    """
+    Group points into compact index boxes: points are binned by tile and
+    each bin becomes the tight [lo, hi] box around its points' indices.
+    lows/highs are (npoints, ndims) index arrays. Returns [(lo, hi, point_rows)].
+    """
+    keys = lows // np.asarray(tile)
+    _, group = np.unique(keys, axis=0, return_inverse=True)
+    group = group.ravel()
+    order = np.argsort(group, kind="stable")
+    bounds = np.flatnonzero(np.diff(group[order])) + 1
+    boxes = []
+    for rows in np.split(order, bounds):
+        boxes.append((lows[rows].min(axis=0), highs[rows].max(axis=0), rows))
+    return boxes
+
+def matchup_points(server, dataset_id, variables, points, columns=None, method="nearest",
+                   tile=None, workers=8, info=None, progress=None):
+    """
+    Extract griddap values at many points with a small number of requests.
+
+    points is a DataFrame with one column per dataset dimension; columns maps
+    dimension names to point columns (default: the dimension name). Dimensions
+    with a single value need no column. Returns a DataFrame aligned with
+    points holding one column per variable (NaN for points outside the grid)
+    and, for nearest, the matched grid coordinates; plus request statistics.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; use one of {', '.join(METHODS)}.")
+    server = server.rstrip('/')
+    info = info or get_dataset_info(server, dataset_id)
+    dimensions = info.get("dimensions", [])
+    if not dimensions or any(not d.get("nvalues") for d in dimensions):
+        raise ValueError(f"{dataset_id} has no griddap dimensions with known sizes.")
+    dim_names = [d["name"] for d in dimensions]
+    data_vars = {v["name"] for v in info.get("variables", [])} - set(dim_names)
+    missing = [v for v in variables if v not in data_vars]
+    if missing:
+        raise ValueError(f"Not data variables of {dataset_id}: {', '.join(missing)}")
+
+    columns = dict(columns or {})
+    for dim in dimensions:
+        col = columns.get(dim["name"], dim["name"])
+        if col in points.columns:
+            columns[dim["name"]] = col
+        elif int(dim["nvalues"]) == 1:
+            columns.pop(dim["name"], None)
+        else:
+            raise ValueError(f"No point column for dimension {dim['name']!r}; map one with --column {dim['name']}=<col>.")
+
+    ndim = len(dimensions)
+    if tile is None:
+        tile = [DEFAULT_LEADING_TILE] * max(0, ndim - 2) + [DEFAULT_SPATIAL_TILE] * min(2, ndim)
+    if len(tile) != ndim:
+        raise ValueError(f"tile needs {ndim} entries, one per dimension ({', '.join(dim_names)}).")
+
+    axes = fetch_axes(server, dataset_id, dimensions, workers)
+
+    # Grid position of every point along every dimension
+    npts = len(points)
+    i0 = np.zeros((npts, ndim), dtype=np.intp)
+    i1 = np.zeros((npts, ndim), dtype=np.intp)
+    weights = np.zeros((npts, ndim))
+    valid = np.ones(npts, dtype=bool)
+    for k, dim in enumerate(dimensions):
+        axis = axes[dim["name"]]
+        if dim["name"] not in columns:
+            continue
+        values = to_axis_values(dim, points[columns[dim["name"]]])
+        if _is_lon_dim(dim):
+            if axis.min() >= 0 and axis.max() > 180:
+                values = np.mod(values, 360.0)
+            elif axis.min() < 0:
+                values = np.where(values > 180, values - 360.0, values)
+        i0[:, k], i1[:, k], weights[:, k], inside = locate(axis, values, method)
+        valid &= inside
+
+    result = pd.DataFrame(np.nan, index=points.index, columns=list(variables))
+    rows_valid = np.flatnonzero(valid)
+    stats = {"points": npts, "outside": int(npts - len(rows_valid)), "requests": 0, "cells": 0}
+    if len(rows_valid) == 0:
+        return result, stats
+
+    lows = np.minimum(i0[rows_valid], i1[rows_valid])
+    highs = np.maximum(i0[rows_valid], i1[rows_valid])
+    boxes = plan_boxes(lows, highs, tile)
+    stats["requests"] = len(boxes)
+    stats["cells"] = int(sum(np.prod(hi - lo + 1) for lo, hi, _ in boxes))
+
+    # Only dimensions where a point falls between two grid cells need corners
+    interp_dims = [k for k in range(ndim) if np.any(i0[rows_valid, k] != i1[rows_valid, k])]
+    out = np.full((npts, len(variables)), np.nan)
+
+    def fetch_box(box):
+        lo, hi, _ = box
+        slices = [f"[{a}:1:{b}]" for a, b in zip(lo, hi)]
+        return fetch_griddap_arrays(server, dataset_id, list(variables), slices)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_box, box): box for box in boxes}
+        for done, future in enumerate(as_completed(futures), 1):
+            lo, _, members = futures[future]
+            arrays = future.result()
+            rows = rows_valid[members]
+            for v, name in enumerate(variables):
+                block = np.asarray(arrays[name], dtype=float)
+                acc = np.zeros(len(rows))
+                for corner in itertools.product((0, 1), repeat=len(interp_dims)):
+                    idx = i0[rows] - lo
+                    w = np.ones(len(rows))
+                    for bit, k in zip(corner, interp_dims):
+                        if bit:
+                            idx[:, k] = i1[rows, k] - lo[k]
+                            w *= weights[rows, k]
+                        else:
+                            w *= 1.0 - weights[rows, k]
+                    # Skip zero-weight corners so a NaN neighbour does not poison the value
+                    corner_values = block[tuple(idx.T)]
+                    acc += np.where(w > 0, corner_values * w, 0.0)
+                out[rows, v] = acc
+            if progress:
+                progress(done, len(boxes))
+
+    result.loc[:, :] = out
+    if method == "nearest":
+        # Grid coordinates each value was taken from, for checking match distances
+        for k, dim in enumerate(dimensions):
+            if dim["name"] not in columns:
+                continue
+            matched = np.full(npts, np.nan)
+            matched[rows_valid] = axes[dim["name"]][i0[rows_valid, k]]
+            if _is_time_dim(dim):
+                matched = pd.to_datetime(matched, unit="s", utc=True).strftime("%Y-%m-%dT%H:%M:%SZ")
+            result[f"{dim['name']}_matched"] = np.asarray(matched)
+    return result, stats
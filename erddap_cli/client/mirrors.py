@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from erddap_cli.client.session import list_known_servers, get_http_session
+
+# Number of most recent measurements kept per server
+LATENCY_WINDOW = 20
+# Servers failing more than this share of recent requests are treated as unhealthy
+MAX_ERROR_RATE = 0.5
+
+# Serializes read-modify-write cycles of the stats file within the process
+_stats_lock = threading.Lock()
+
+
+def get_latency_stats_path():
+    return os.path.expanduser("~/.erddap_cli_latency.json")
+
+def load_latency_stats():
+    path = get_latency_stats_path()
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def save_latency_stats(stats):
+    # Write then rename, so a reader never sees a half-written file
+    path = get_latency_stats_path()
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def record_requests(measurements, stats=None):
+    """
+    Add (server, latency, ok) measurements to the rolling windows. latency
+    is the time to the response headers of a probe, or None for calls whose
+    duration is not comparable (full downloads, cached results); those only
+    count towards the error rate. Without stats, the measurements are merged
+    into the file as it is now, so concurrent recorders do not lose updates.
+    """
+    def apply(stats):
+        for server, latency, ok in measurements:
+            entry = stats.setdefault(server.rstrip('/'), {"latencies": [], "errors": []})
+            if ok and latency is not None:
+                entry["latencies"] = (entry["latencies"] + [round(latency, 4)])[-LATENCY_WINDOW:]
+            entry["errors"] = (entry["errors"] + [0 if ok else 1])[-LATENCY_WINDOW:]
+        return stats
+
+    if stats is not None:
+        return apply(stats)
+    with _stats_lock:
+        stats = apply(load_latency_stats())
+        save_latency_stats(stats)
+    return stats
+
+def record_request(server, latency, ok, stats=None):
+    """Add one measurement for a server; see record_requests."""
+    return record_requests([(server, latency, ok)], stats)
+
+def server_health(server, stats=None):
+    """
+    Summarize the rolling window for a server as (mean latency, error rate).
+    Servers without measurements get (None, 0.0).
+    """
+    if stats is None:
+        stats = load_latency_stats()
+    entry = stats.get(server.rstrip('/'), {})
+    latencies = entry.get("latencies", [])
+    errors = entry.get("errors", [])
+    mean_latency = sum(latencies) / len(latencies) if latencies else None
+    error_rate = sum(errors) / len(errors) if errors else 0.0
+    return mean_latency, error_rate
+
+def rank_servers(servers, stats=None):
+    """
+    Order servers fastest-healthy first. Unhealthy servers go last, servers
+    with no measurements sit between the measured healthy ones and those.
+    """
+    if stats is None:
+        stats = load_latency_stats()
+
+    def sort_key(server):
+        mean_latency, error_rate = server_health(server, stats)
+        if error_rate > MAX_ERROR_RATE:
+            return (2, error_rate, mean_latency or 0.0)
+        if mean_latency is None:
+            return (1, 0.0, 0.0)
+        return (0, mean_latency, error_rate)
+
+    return sorted(servers, key=sort_key)
+
+def probe_dataset(server, dataset_id, timeout=5):
+    """
+    Check whether a server carries a dataset ID. Returns (found, latency),
+    where found is None when the server is unreachable or answers with a 5xx.
+    Only the response headers are read, so the probe stays cheap.
+    """
+    url = f"{server.rstrip('/')}/info/{dataset_id}/index.csv"
+    start = time.perf_counter()
+    try:
+        with get_http_session().get(url, timeout=timeout, stream=True) as resp:
+            latency = time.perf_counter() - start
+            # A server that is up but failing is an error, not a clean "not found"
+            if resp.status_code >= 500:
+                return None, latency
+            return resp.status_code == 200, latency
+    except requests.RequestException:
+        return None, time.perf_counter() - start
+
+def find_mirrors(dataset_id, origin=None, servers=None, timeout=5):
+    """
+    Probe the origin server plus the known servers concurrently and return the
+    ones serving dataset_id, ranked by rolling latency and error rate.
+    """
+    if servers is None:
+        servers = [s["url"] for s in list_known_servers()]
+    if origin:
+        servers = [origin] + list(servers)
+    servers = list(dict.fromkeys(s.rstrip('/') for s in servers))
+
+    with ThreadPoolExecutor(max_workers=len(servers) or 1) as pool:
+        results = list(pool.map(lambda s: probe_dataset(s, dataset_id, timeout), servers))
+
+    # A clean "not found" says nothing about server health, so only record
+    # hits and failures (connection errors and 5xx).
+    measurements = [(server, latency, bool(found)) for server, (found, latency) in zip(servers, results)
+                    if found is not False]
+    stats = record_requests(measurements)
+    return rank_servers([server for server, (found, _) in zip(servers, results) if found], stats)
+
+def call_with_failover(servers, func, *args, **kwargs):
+    """
+    Call func(server, *args, **kwargs) on each server in order until one succeeds.
+    Returns (server, result) and raises the last error if every server fails.
+    """
+    last_error = None
+    for server in servers:
+        # Only success/failure is recorded: the call may be a cache hit or a
+        # large transfer, neither comparable with the probe latencies.
+        try:
+            result = func(server, *args, **kwargs)
+        except Exception as err:
+            record_request(server, None, False)
+            print(f"Server {server} failed ({err}), trying next mirror...")
+            last_error = err
+            continue
+        record_request(server, None, True)
+        return server, result
+    if last_error is None:
+        raise RuntimeError("No servers available.")
+    raise last_error
+
+def swap_server(url, old_server, new_server):
+    """Point a request URL built against old_server at new_server instead."""
+    old_server = old_server.rstrip('/')
+    if url.startswith(old_server):
+        return new_server.rstrip('/') + url[len(old_server):]
+    return url
@@ -0,0 +1,113 @@
+import io
+import os
+import csv
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many bytes per chunk, process start-up and pickling cost more
+# than the parse itself and the CSV is parsed in-process.
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+
+# The CSV buffer shared with pool workers. It is set by the pool initializer,
+# so with the fork start method workers inherit it without a copy.
+_DATA = None
+
+
+def _init_worker(data):
+    global _DATA
+    _DATA = data
+
+def _read_line(data, pos):
+    end = data.find(b"\n", pos)
+    end = len(data) if end == -1 else end + 1
+    return data[pos:end].decode("utf-8").rstrip("\r\n"), end
+
+def split_rows(data, start, nchunks):
+    """
+    Split data[start:] into up to nchunks (begin, end) byte ranges that each
+    end on a row boundary. Newlines inside quoted fields are not boundaries.
+    """
+    size = len(data) - start
+    step = max(size // max(nchunks, 1), 1)
+    ranges = []
+    begin = start
+    while begin < len(data):
+        target = begin + step
+        if target >= len(data) or len(ranges) == nchunks - 1:
+            ranges.append((begin, len(data)))
+            break
+        nl = data.find(b"\n", target)
+        if nl == -1:
+            ranges.append((begin, len(data)))
+            break
+        # An odd number of quotes since the last boundary means nl is inside a field
+        quotes = data.count(b'"', begin, nl)
+        while quotes % 2 and nl != -1:
+            nxt = data.find(b"\n", nl + 1)
+            quotes += data.count(b'"', nl, len(data) if nxt == -1 else nxt)
+            nl = nxt
+        if nl == -1:
+            ranges.append((begin, len(data)))
+            break
+        ranges.append((begin, nl + 1))
+        begin = nl + 1
+    return ranges
+
+def _parse_chunk(begin, end, names, data=None):
+    """
+    Parse one row range. Every value is kept as the server's text, as in
+    the single-worker read, so the result never depends on how the rows
+    were split.
+    """
+    data = _DATA if data is None else data
+    return pd.read_csv(io.BytesIO(data[begin:end]), header=None, names=names, dtype=str, keep_default_na=False)
+
+def _parse_task(task):
+    return _parse_chunk(*task)
+
+def read_csv_parallel(source, workers=None, units_row=True, min_chunk_bytes=MIN_CHUNK_BYTES):
+    """
+    Parse an ERDDAP CSV (bytes or a file path) on several cores.
+
+    The body is split at row boundaries and the chunks are parsed in a
+    process pool, then concatenated in their original order. Values stay
+    text exactly as sent (no number or time inference), so any number of
+    workers gives the same frame as a single read.
+    Returns (DataFrame, {column: units}); units is empty when units_row is False.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = bytes(source)
+
+    header, pos = _read_line(data, 0)
+    names = next(csv.reader([header]))
+    units = {}
+    if units_row:
+        line, pos = _read_line(data, pos)
+        values = next(csv.reader([line]), [])
+        units = {col: (values[i] if i < len(values) else '') for i, col in enumerate(names)}
+
+    if pos >= len(data):
+        return pd.DataFrame(columns=names), units
+
+    workers = workers or os.cpu_count() or 1
+    nchunks = min(workers, max(1, (len(data) - pos) // max(min_chunk_bytes, 1)))
+    ranges = split_rows(data, pos, nchunks)
+
+    if len(ranges) == 1:
+        return _parse_chunk(*ranges[0], names, data=data), units
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=_init_worker, initargs=(data,)) as pool:
+        results = list(pool.map(_parse_task, [(begin, end, names) for begin, end in ranges]))
+
+    return pd.concat(results, ignore_index=True), units
+
+def write_csv(df, units, path):
+    """Write a frame as ERDDAP-style CSV: header, units row, then the rows."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(df.columns)
+        writer.writerow([units.get(col, '') for col in df.columns])
+        df.to_csv(f, index=False, header=False)
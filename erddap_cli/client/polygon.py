@@ -0,0 +1,247 @@
+import json
+import numpy as np
+
+# Tabledap has no grid, so the polygon's bounding box is rasterized into
+# this many cells along its longer side before being merged into boxes.
+TABLEDAP_CELLS = 64
+DEFAULT_MAX_BOXES = 16
+# Above this many cells per axis, griddap cells are grouped into blocks
+MAX_GRID_CELLS = 512
+
+
+def load_polygon(path):
+    """
+    Read a GeoJSON Polygon or MultiPolygon (bare, as a Feature or in a
+    FeatureCollection) into a list of polygons, each a list of (n, 2)
+    lon/lat rings: the exterior first, then any holes.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    geometries = []
+    def collect(obj):
+        kind = obj.get("type")
+        if kind == "FeatureCollection":
+            for feature in obj.get("features", []):
+                collect(feature)
+        elif kind == "Feature":
+            collect(obj.get("geometry") or {})
+        elif kind == "GeometryCollection":
+            for geometry in obj.get("geometries", []):
+                collect(geometry)
+        elif kind == "Polygon":
+            geometries.append(obj["coordinates"])
+        elif kind == "MultiPolygon":
+            geometries.extend(obj["coordinates"])
+    collect(doc)
+    polygons = []
+    for rings in geometries:
+        arrays = [np.asarray(ring, dtype=float)[:, :2] for ring in rings if len(ring) >= 3]
+        if arrays:
+            polygons.append(arrays)
+    if not polygons:
+        raise ValueError(f"No Polygon or MultiPolygon geometry in {path}.")
+    return polygons
+
+def shift_longitudes(polygons, to_360):
+    """Express polygon longitudes in 0..360 (to_360) or -180..180, to match a dataset."""
+    shifted = []
+    for rings in polygons:
+        new_rings = []
+        for ring in rings:
+            ring = ring.copy()
+            ring[:, 0] = np.mod(ring[:, 0], 360.0) if to_360 else np.where(ring[:, 0] > 180, ring[:, 0] - 360.0, ring[:, 0])
+            new_rings.append(ring)
+        shifted.append(new_rings)
+    return shifted
+
+def polygon_bounds(polygons):
+    """(min_lon, min_lat, max_lon, max_lat) over every ring."""
+    points = np.concatenate([ring for rings in polygons for ring in rings])
+    return points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()
+
+def _edges(polygons):
+    for rings in polygons:
+        for ring in rings:
+            closed = ring if np.array_equal(ring[0], ring[-1]) else np.vstack([ring, ring[:1]])
+            yield closed[:-1], closed[1:]
+
+def points_in_polygon(x, y, polygons):
+    """
+    Vectorized even-odd point-in-polygon test; holes and multiple polygons
+    are handled by the parity rule. Points are sorted by y once so each
+    edge only tests the points in its latitude band.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    order = np.argsort(y, kind="stable")
+    xs, ys = x[order], y[order]
+    inside = np.zeros(len(x), dtype=bool)
+    for start, end in _edges(polygons):
+        for (x1, y1), (x2, y2) in zip(start, end):
+            if y1 == y2:
+                continue
+            lo, hi = (y1, y2) if y1 < y2 else (y2, y1)
+            i0, i1 = np.searchsorted(ys, lo, "left"), np.searchsorted(ys, hi, "left")
+            if i0 == i1:
+                continue
+            band = slice(i0, i1)
+            x_cross = x1 + (ys[band] - y1) * (x2 - x1) / (y2 - y1)
+            inside[band] ^= xs[band] < x_cross
+    result = np.empty(len(x), dtype=bool)
+    result[order] = inside
+    return result
+
+def cover_cells(polygons, x_edges, y_edges):
+    """
+    Conservative mask of the cells (rows = y, columns = x, given by
+    ascending edge arrays) that intersect the polygons. A cell is kept when
+    a corner lies inside, or the boundary passes through it or a neighbour.
+    """
+    nx, ny = len(x_edges) - 1, len(y_edges) - 1
+    gx, gy = np.meshgrid(x_edges, y_edges)
+    corners = points_in_polygon(gx, gy, polygons).reshape(ny + 1, nx + 1)
+    mask = corners[:-1, :-1] | corners[1:, :-1] | corners[:-1, 1:] | corners[1:, 1:]
+
+    # Sample the boundary at most a cell apart; with a one-cell dilation this
+    # catches every cell the boundary crosses, including thin slivers.
+    step = min(np.diff(x_edges).min(), np.diff(y_edges).min())
+    boundary = np.zeros((ny, nx), dtype=bool)
+    for start, end in _edges(polygons):
+        lengths = np.hypot(*(end - start).T)
+        counts = np.maximum(np.ceil(lengths / step).astype(int), 1)
+        t = np.concatenate([np.arange(n + 1) / n for n in counts])
+        seg = np.repeat(np.arange(len(start)), counts + 1)
+        px = start[seg, 0] + t * (end[seg, 0] - start[seg, 0])
+        py = start[seg, 1] + t * (end[seg, 1] - start[seg, 1])
+        cx = np.searchsorted(x_edges, px, "right") - 1
+        cy = np.searchsorted(y_edges, py, "right") - 1
+        ok = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+        boundary[cy[ok], cx[ok]] = True
+    padded = np.pad(boundary, 1)
+    dilated = np.zeros_like(boundary)
+    for dy in range(3):
+        for dx in range(3):
+            dilated |= padded[dy:dy + ny, dx:dx + nx]
+    return mask | dilated
+
+def _runs(row):
+    """Half-open (start, stop) column ranges of the True runs in a boolean row."""
+    diff = np.diff(np.concatenate([[0], row.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(diff == 1), np.flatnonzero(diff == -1)))
+
+def mask_to_boxes(mask):
+    """
+    Cover the True cells of a 2-D mask with disjoint rectangles by merging
+    identical column runs of consecutive rows. Returns half-open
+    (row0, row1, col0, col1) tuples.
+    """
+    boxes = []
+    open_runs = {}
+    for r in range(mask.shape[0] + 1):
+        runs = set(_runs(mask[r])) if r < mask.shape[0] else set()
+        for run in list(open_runs):
+            if run not in runs:
+                boxes.append((open_runs.pop(run), r, *run))
+        for run in runs:
+            open_runs.setdefault(run, r)
+    return boxes
+
+def boxes_for_mask(mask, max_boxes=DEFAULT_MAX_BOXES):
+    """
+    Rectangles covering mask, at most max_boxes of them: the mask is
+    coarsened by 2, 4, ... until few enough rectangles remain, and each one
+    is then shrunk to the cells of the original mask it actually covers.
+    """
+    ny, nx = mask.shape
+    factor = 1
+    while True:
+        py, px = -(-ny // factor) * factor, -(-nx // factor) * factor
+        padded = np.zeros((py, px), dtype=bool)
+        padded[:ny, :nx] = mask
+        coarse = padded.reshape(py // factor, factor, px // factor, factor).any(axis=(1, 3))
+        boxes = mask_to_boxes(coarse)
+        if len(boxes) <= max_boxes or coarse.size == 1:
+            break
+        factor *= 2
+
+    result = []
+    for r0, r1, c0, c1 in boxes:
+        r0, r1, c0, c1 = r0 * factor, min(r1 * factor, ny), c0 * factor, min(c1 * factor, nx)
+        sub = mask[r0:r1, c0:c1]
+        rows, cols = np.flatnonzero(sub.any(axis=1)), np.flatnonzero(sub.any(axis=0))
+        if len(rows) and len(cols):
+            result.append((r0 + rows[0], r0 + rows[-1] + 1, c0 + cols[0], c0 + cols[-1] + 1))
+    return result
+
+def tabledap_boxes(polygons, max_boxes=DEFAULT_MAX_BOXES, cells=TABLEDAP_CELLS):
+    """
+    Lon/lat boxes (min_lon, max_lon, min_lat, max_lat) covering the polygons.
+    Boxes share edges only; query them half-open (>= min, < max) so no row
+    is returned by two boxes.
+    """
+    x0, y0, x1, y1 = polygon_bounds(polygons)
+    width, height = max(x1 - x0, 1e-9), max(y1 - y0, 1e-9)
+    # Pad so points on the polygon's outer edge fall inside a half-open box
+    x0, x1, y0, y1 = x0 - width * 1e-3, x1 + width * 1e-3, y0 - height * 1e-3, y1 + height * 1e-3
+    nx = max(1, int(round(cells * min(1.0, width / height))))
+    ny = max(1, int(round(cells * min(1.0, height / width))))
+    x_edges, y_edges = np.linspace(x0, x1, nx + 1), np.linspace(y0, y1, ny + 1)
+    mask = cover_cells(polygons, x_edges, y_edges)
+    return [
+        (float(x_edges[c0]), float(x_edges[c1]), float(y_edges[r0]), float(y_edges[r1]))
+        for r0, r1, c0, c1 in boxes_for_mask(mask, max_boxes)
+    ]
+
+def _cell_edges(values):
+    """Edges halfway between ascending axis values, extended half a step at the ends."""
+    if len(values) == 1:
+        return np.array([values[0] - 0.5, values[0] + 0.5])
+    mid = (values[:-1] + values[1:]) / 2
+    return np.concatenate([[values[0] - (mid[0] - values[0])], mid, [values[-1] + (values[-1] - mid[-1])]])
+
+def griddap_boxes(polygons, lat_axis, lon_axis, max_boxes=DEFAULT_MAX_BOXES):
+    """
+    Index boxes ((lat_start, lat_stop), (lon_start, lon_stop)), inclusive and
+    in the axes' own order, covering the grid points inside the polygons.
+    Boxes are disjoint, so no grid point is fetched twice.
+    """
+    axes = []
+    x0, y0, x1, y1 = polygon_bounds(polygons)
+    for axis, lo, hi in ((lat_axis, y0, y1), (lon_axis, x0, x1)):
+        axis = np.asarray(axis, dtype=float)
+        descending = len(axis) > 1 and axis[0] > axis[-1]
+        values = axis[::-1] if descending else axis
+        edges = _cell_edges(values)
+        # Only the cells overlapping the polygon's extent are considered
+        a = max(int(np.searchsorted(edges, lo, "right")) - 1, 0)
+        b = min(int(np.searchsorted(edges, hi, "left")), len(values))
+        axes.append((values, edges, descending, a, b))
+    (lat_v, lat_e, lat_desc, la, lb), (lon_v, lon_e, lon_desc, oa, ob) = axes
+    if la >= lb or oa >= ob:
+        return []
+
+    # Group cells into blocks when the window is large
+    by = -(-(lb - la) // MAX_GRID_CELLS)
+    bx = -(-(ob - oa) // MAX_GRID_CELLS)
+    if by == 1 and bx == 1:
+        gx, gy = np.meshgrid(lon_v[oa:ob], lat_v[la:lb])
+        mask = points_in_polygon(gx, gy, polygons).reshape(gx.shape)
+    else:
+        y_edges = lat_e[la:lb + 1][::by]
+        x_edges = lon_e[oa:ob + 1][::bx]
+        if y_edges[-1] != lat_e[lb]:
+            y_edges = np.append(y_edges, lat_e[lb])
+        if x_edges[-1] != lon_e[ob]:
+            x_edges = np.append(x_edges, lon_e[ob])
+        mask = cover_cells(polygons, x_edges, y_edges)
+
+    boxes = []
+    for r0, r1, c0, c1 in boxes_for_mask(mask, max_boxes):
+        lat_range = (la + r0 * by, min(la + r1 * by, lb) - 1)
+        lon_range = (oa + c0 * bx, min(oa + c1 * bx, ob) - 1)
+        if lat_desc:
+            lat_range = (len(lat_v) - 1 - lat_range[1], len(lat_v) - 1 - lat_range[0])
+        if lon_desc:
+            lon_range = (len(lon_v) - 1 - lon_range[1], len(lon_v) - 1 - lon_range[0])
+        boxes.append((tuple(int(i) for i in lat_range), tuple(int(i) for i in lon_range)))
+    return boxes
@@ -1,10 +1,47 @@
 import pandas as pd
+import io
 import re
+import time
 import requests
-import urllib.error
 import os
 import json
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
 from erddapy import ERDDAP
+from erddap_cli.client.journal import JournaledSession, record_cache_hit, cache_miss
+
+# Seconds a dataset's info stays in the in-process metadata cache
+INFO_CACHE_TTL = 600
+HTTP_TIMEOUT = 60
+
+_http_session = None
+_info_cache = {}
+
+def get_http_session():
+    """
+    Shared requests session, so repeated calls in one process (e.g. the daemon)
+    reuse pooled keep-alive connections instead of opening new TLS connections.
+    Every request through it is recorded in the request journal.
+    """
+    global _http_session
+    if _http_session is None:
+        _http_session = JournaledSession()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        _http_session.mount("http://", adapter)
+        _http_session.mount("https://", adapter)
+    return _http_session
+
+def read_csv_url(url, **kwargs):
+    """
+    Download a CSV over the pooled session and parse it with pandas.
+    Raises requests.HTTPError for non-2xx responses.
+    """
+    resp = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+    resp.raise_for_status()
+    return pd.read_csv(io.BytesIO(resp.content), **kwargs)
+
+def clear_info_cache():
+    _info_cache.clear()
 
 def build_search_url(server, query, page=1, items_per_page=25, 
                      min_lon=None, max_lon=None, min_lat=None, max_lat=None,
@@ -71,7 +108,7 @@ def search_datasets(server, query, page=1, items_per_page=25,
     )
     print(f"\nUsing search URL -> {url}\n")
     print(f"Page {page}, {items_per_page} items:\n(Dataset ID : Title)\n")
-    df = pd.read_csv(url)
+    df = read_csv_url(url)
     return df.to_dict(orient="records")
 
 
@@ -90,10 +127,10 @@ def get_total_count(server, query,
     print(f"\nFetching ALL results for count from -> {url}\n")
 
     try:
-        df = pd.read_csv(url, comment='#')
+        df = read_csv_url(url, comment='#')
         return len(df)
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
             print("Server returned 404 for total count request, possible URL encoding error or network issues.")
             return 0
         else:
@@ -105,22 +142,38 @@ def get_total_count(server, query,
 def get_dataset_info(server: str, dataset_id: str) -> dict[str, any]:
     """
     Fetch global metadata and per-variable attributes for a dataset.
+    Results are cached in-process for INFO_CACHE_TTL seconds.
     """
+    cache_key = (server.rstrip('/'), dataset_id)
+    cached = _info_cache.get(cache_key)
+    if cached and time.time() - cached[0] < INFO_CACHE_TTL:
+        record_cache_hit(server, "info")
+        return cached[1]
+
     # Build the ERDDAP info CSV URL
     e = ERDDAP(server=server)
     e.dataset_id = dataset_id
     info_url = e.get_info_url(response="csv")
 
     try:
-        df = pd.read_csv(
-            info_url,
-            comment='#',
-            engine='python',
-            skip_blank_lines=True
-        )
+        with cache_miss():
+            df = read_csv_url(
+                info_url,
+                comment='#',
+                engine='python',
+                skip_blank_lines=True
+            )
     except Exception as err:
         raise RuntimeError(f"Failed to parse dataset info CSV from {info_url!r}: {err}")
 
+    info = parse_dataset_info(df, dataset_id)
+    _info_cache[cache_key] = (time.time(), info)
+    return info
+
+def parse_dataset_info(df: pd.DataFrame, dataset_id: str) -> dict[str, any]:
+    """
+    Turn a parsed ERDDAP info CSV into the dataset info dict.
+    """
     df = df.fillna('')
 
     # Global attributes
@@ -226,6 +279,27 @@ def get_download_url(server, dataset_id, variables=None, constraints=None, respo
 
     return e.get_download_url()
 
+def build_tabledap_url(server, dataset_id, variables=None, constraints=None, filters=None, response_format="csv"):
+    """
+    Build a tabledap request URL without going through erddapy.
+    constraints maps "var>=" style keys to values; filters are server-side
+    functions such as 'distinct()' and are appended as given.
+    """
+    parts = [",".join(variables or [])]
+    for key, value in (constraints or {}).items():
+        parts.append(quote(f"{key}{value}", safe="=,-_.:/()!~*"))
+    parts.extend(filters or [])
+    return f"{server.rstrip('/')}/tabledap/{dataset_id}.{response_format}?{'&'.join(parts)}"
+
+def build_griddap_url(server, dataset_id, variables, slices, response_format="csv"):
+    """
+    Build a griddap request URL. slices holds one "[start:stride:stop]" string
+    per dimension, in dimension order, and is applied to every variable.
+    """
+    slice_string = quote("".join(slices), safe="[]():,-_.")
+    query = ",".join(f"{var}{slice_string}" for var in variables)
+    return f"{server.rstrip('/')}/griddap/{dataset_id}.{response_format}?{query}"
+
 DEFAULT_SERVERS = [
     {"name": "NOAA CoastWatch", "url": "https://coastwatch.pfeg.noaa.gov/erddap"},
     {"name": "IOOS Glider DAC", "url": "https://data.ioos.us/gliders/erddap"},
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import uuid
+import pandas as pd
+import requests
+
+
+def get_store_dir():
+    return os.path.expanduser("~/.erddap_cli_store")
+
+def _index_path(store_dir):
+    return os.path.join(store_dir, "index.json")
+
+def load_store_index(store_dir=None):
+    path = _index_path(store_dir or get_store_dir())
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return []
+    return []
+
+def save_store_index(entries, store_dir=None):
+    store_dir = store_dir or get_store_dir()
+    os.makedirs(store_dir, exist_ok=True)
+    with open(_index_path(store_dir), "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2)
+
+def constraints_to_bounds(constraints):
+    """Turn {"var>=": lo, "var<=": hi} tabledap constraints into {var: [lo, hi]}."""
+    bounds = {}
+    for key, value in (constraints or {}).items():
+        for op, pos in ((">=", 0), ("<=", 1)):
+            if key.endswith(op):
+                bounds.setdefault(key[:-len(op)], [None, None])[pos] = str(value)
+    return bounds
+
+def _as_value(value):
+    """
+    Comparable form of a bound: float for numbers, UTC Timestamp for times.
+    Raises ValueError for anything else, including ERDDAP's relative times
+    (now-7days, max(time)-1day), whose meaning changes from query to query.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        text = str(value).strip()
+        if text.lower().startswith(("now", "min(", "max(")):
+            raise ValueError(f"Relative bound {text!r} cannot be cached.")
+        ts = pd.Timestamp(text)
+        return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+def cacheable_bounds(bounds):
+    """True when every bound is an absolute number or time, so the query can be stored and matched."""
+    try:
+        for lo, hi in bounds.values():
+            for value in (lo, hi):
+                if value is not None:
+                    _as_value(value)
+    except ValueError:
+        return False
+    return True
+
+def split_units(raw):
+    """
+    Split a raw ERDDAP CSV frame (first row = units) into the data rows and a
+    {column: units} dict. Values are left exactly as read, so a frame read as
+    text (dtype=str, keep_default_na=False) keeps the server's spelling, e.g.
+    station "0012" or time "2024-01-01T00:00:00.5Z".
+    """
+    if raw.empty:
+        return raw, {}
+    units = {col: ('' if pd.isna(u) else str(u)) for col, u in raw.iloc[0].items()}
+    df = raw.iloc[1:].reset_index(drop=True).copy()
+    return df, units
+
+def join_units(df, units):
+    """Inverse of split_units: prepend the units row."""
+    out = df.astype(object)
+    header = pd.DataFrame([[units.get(col, '') for col in out.columns]], columns=out.columns)
+    return pd.concat([header, out], ignore_index=True)
+
+def _comparable(column, bound):
+    """Column values in the same form as _as_value(bound), for comparison."""
+    if isinstance(bound, float):
+        return pd.to_numeric(column, errors="coerce")
+    return pd.to_datetime(column, utc=True, errors="coerce")
+
+def _filter(df, bounds):
+    """
+    Vectorized range filter by {var: [lo, hi]}. Only the bounded columns are
+    converted, and only for the comparison; the returned rows keep their text.
+    """
+    mask = pd.Series(True, index=df.index)
+    for var, (lo, hi) in bounds.items():
+        for bound, above in ((lo, True), (hi, False)):
+            if bound is None:
+                continue
+            value = _as_value(bound)
+            column = _comparable(df[var], value)
+            mask &= (column >= value) if above else (column <= value)
+    return df[mask]
+
+def _within(outer, inner):
+    """True if the range inner = [lo, hi] lies inside outer (None = unbounded)."""
+    if outer[0] is not None and (inner[0] is None or _as_value(inner[0]) < _as_value(outer[0])):
+        return False
+    if outer[1] is not None and (inner[1] is None or _as_value(inner[1]) > _as_value(outer[1])):
+        return False
+    return True
+
+def _missing_slices(stored, wanted):
+    """
+    Parts of the wanted range outside the stored one, as tabledap constraint
+    dicts for a single variable. Returns None when the ranges do not overlap.
+    """
+    var = stored["var"]
+    s_lo, s_hi = stored["range"]
+    w_lo, w_hi = wanted
+    if (w_hi is not None and s_lo is not None and _as_value(w_hi) < _as_value(s_lo)) or \
+       (w_lo is not None and s_hi is not None and _as_value(w_lo) > _as_value(s_hi)):
+        return None
+    slices = []
+    if s_lo is not None and (w_lo is None or _as_value(w_lo) < _as_value(s_lo)):
+        part = {f"{var}<": s_lo}
+        if w_lo is not None:
+            part[f"{var}>="] = w_lo
+        slices.append(part)
+    if s_hi is not None and (w_hi is None or _as_value(w_hi) > _as_value(s_hi)):
+        part = {f"{var}>": s_hi}
+        if w_hi is not None:
+            part[f"{var}<="] = w_hi
+        slices.append(part)
+    return slices
+
+def find_coverage(entries, server, dataset_id, variables, bounds):
+    """
+    Look for a stored result that answers the query.
+    Returns (entry, None) when an entry covers it fully, (entry, plan) when an
+    entry covers it except along one variable, where plan is
+    (var, new_range, constraint slices to fetch), or (None, None).
+    """
+    server = server.rstrip('/')
+    partial = None
+    for entry in entries:
+        if entry["server"] != server or entry["dataset_id"] != dataset_id or not entry.get("text"):
+            continue
+        stored_vars = set(entry["variables"])
+        if not set(variables) <= stored_vars or not set(bounds) <= stored_vars:
+            continue
+        # An entry saved with a bound that cannot be compared is skipped, not fatal
+        if not cacheable_bounds(entry["bounds"]):
+            continue
+
+        outside = []
+        for var, stored_range in entry["bounds"].items():
+            wanted = bounds.get(var, [None, None])
+            if not _within(stored_range, wanted):
+                outside.append(var)
+        if not outside:
+            return entry, None
+        if len(outside) == 1 and partial is None:
+            var = outside[0]
+            wanted = bounds.get(var, [None, None])
+            slices = _missing_slices({"var": var, "range": entry["bounds"][var]}, wanted)
+            if slices:
+                stored_lo, stored_hi = entry["bounds"][var]
+                # The merged entry spans the union of both ranges
+                new_lo = None if wanted[0] is None or stored_lo is None else min(stored_lo, wanted[0], key=_as_value)
+                new_hi = None if wanted[1] is None or stored_hi is None else max(stored_hi, wanted[1], key=_as_value)
+                partial = (entry, (var, [new_lo, new_hi], slices))
+    return partial if partial else (None, None)
+
+def _entry_path(entry, store_dir):
+    return os.path.join(store_dir, f"{entry['id']}.pkl")
+
+def save_result(server, dataset_id, variables, bounds, raw, store_dir=None):
+    """Store a raw ERDDAP CSV frame (units row first) with the query that produced it."""
+    df, units = split_units(raw)
+    return save_frame(server, dataset_id, variables, bounds, df, units, store_dir)
+
+def save_frame(server, dataset_id, variables, bounds, df, units, store_dir=None):
+    """
+    Store a frame and its {column: units} dict, as split_units returns them.
+    Raises ValueError when a bound is relative and cannot be matched later.
+    """
+    if not cacheable_bounds(bounds):
+        raise ValueError("Queries with relative bounds are not stored.")
+    store_dir = store_dir or get_store_dir()
+    os.makedirs(store_dir, exist_ok=True)
+    entry = {
+        "id":         uuid.uuid4().hex,
+        "server":     server.rstrip('/'),
+        "dataset_id": dataset_id,
+        "variables":  list(variables),
+        "bounds":     {var: list(rng) for var, rng in bounds.items()},
+        "units":      units,
+        "rows":       len(df),
+        # Rows are stored as the server's text; older entries were converted lossily
+        "text":       True,
+        "created":    time.time(),
+    }
+    df.to_pickle(_entry_path(entry, store_dir))
+    entries = load_store_index(store_dir)
+    entries.append(entry)
+    save_store_index(entries, store_dir)
+    return entry
+
+def load_result(entry, store_dir=None):
+    return pd.read_pickle(_entry_path(entry, store_dir or get_store_dir()))
+
+def answer_query(server, dataset_id, variables, bounds, fetch, store_dir=None, log=print):
+    """
+    Answer a tabledap query from the store when possible.
+
+    fetch(variables, constraints) must return a raw ERDDAP CSV frame; it is
+    only called for the slices missing from a partially covering entry, after
+    which the entry is extended in place. Returns a raw frame (units row first)
+    or None when nothing stored overlaps usefully.
+    """
+    if not cacheable_bounds(bounds):
+        return None
+    store_dir = store_dir or get_store_dir()
+    entries = load_store_index(store_dir)
+    entry, plan = find_coverage(entries, server, dataset_id, variables, bounds)
+    if entry is None:
+        return None
+
+    df = load_result(entry, store_dir)
+    units = entry["units"]
+    if plan is not None:
+        var, new_range, slices = plan
+        # Keep the entry's other constraints so the merged data stays consistent
+        base = {}
+        for other, (lo, hi) in entry["bounds"].items():
+            if other == var:
+                continue
+            if lo is not None:
+                base[f"{other}>="] = lo
+            if hi is not None:
+                base[f"{other}<="] = hi
+        below, above = [], []
+        for part in slices:
+            log(f"Fetching missing slice: {', '.join(f'{k}{v}' for k, v in part.items())}")
+            try:
+                raw = fetch(entry["variables"], {**base, **part})
+            except requests.HTTPError as err:
+                # ERDDAP answers 404 for an empty slice
+                if err.response is not None and err.response.status_code == 404:
+                    continue
+                raise
+            fetched, fetched_units = split_units(raw)
+            units = {**fetched_units, **units}
+            (below if f"{var}<" in part else above).append(fetched[entry["variables"]])
+        # The slices are strictly outside the stored range, so nothing overlaps;
+        # identical rows are real data and are kept. Placing the slices around
+        # the stored rows keeps the server's row order.
+        df = pd.concat(below + [df] + above, ignore_index=True)
+
+        entry["bounds"][var] = new_range
+        entry["units"] = units
+        entry["rows"] = len(df)
+        df.to_pickle(_entry_path(entry, store_dir))
+        save_store_index(entries, store_dir)
+    else:
+        log(f"Answered from local store (entry {entry['id'][:8]}, {entry['rows']} rows).")
+
+    result = _filter(df, bounds)[list(variables)]
+    return join_units(result.reset_index(drop=True), units)
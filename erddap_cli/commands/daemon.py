@@ -0,0 +1,318 @@
+# erddap_cli/commands/daemon.py
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import subprocess
+import socketserver
+import contextlib
+
+# Commands that are safe to run inside the daemon: no interactive prompts
+FORWARDABLE_COMMANDS = {"search", "describe", "servers"}
+CONNECT_TIMEOUT = 0.5
+# The daemon acknowledges a command as soon as it reads it; without an
+# acknowledgement by then the command runs in-process instead.
+ACCEPT_TIMEOUT = 2
+# While a command runs the daemon sends a keepalive line this often. Once a
+# command is accepted the caller waits for it, unless the keepalives stop,
+# which means the daemon died and the command is no longer running.
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_TIMEOUT = 30
+
+
+def get_socket_path():
+    return os.path.expanduser("~/.erddap_cli_daemon.sock")
+
+def daemon_supported():
+    return hasattr(socket, "AF_UNIX")
+
+def _send_request(payload: dict, timeout=None):
+    """Send one JSON request to the daemon and return its decoded reply."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(get_socket_path())
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    finally:
+        sock.close()
+    if not line:
+        raise ConnectionError("Daemon closed the connection without replying.")
+    return json.loads(line)
+
+def _send_command(argv: list):
+    """
+    Forward a command and wait for its result. Raises before the daemon has
+    accepted it, or if the daemon goes silent, so the caller can run it itself.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(get_socket_path())
+        sock.settimeout(ACCEPT_TIMEOUT)
+        sock.sendall(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            ack = f.readline()
+            if not ack or not json.loads(ack).get("accepted"):
+                raise ConnectionError("Daemon did not accept the command.")
+            sock.settimeout(KEEPALIVE_TIMEOUT)
+            while True:
+                line = f.readline()
+                if not line:
+                    raise ConnectionError("Daemon closed the connection without replying.")
+                reply = json.loads(line)
+                if not reply.get("keepalive"):
+                    return reply
+    finally:
+        sock.close()
+
+def forward_to_daemon(argv: list):
+    """
+    Run a CLI invocation in the daemon if one is listening.
+    Returns the exit code, or None if the command must run in-process.
+    """
+    if not argv or argv[0] not in FORWARDABLE_COMMANDS:
+        return None
+    if "-h" in argv or "--help" in argv:
+        return None
+    if not daemon_supported() or not os.path.exists(get_socket_path()):
+        return None
+    try:
+        reply = _send_command(argv)
+    except (OSError, ValueError):
+        # Unreachable, not accepting, or gone mid-command: nothing runs the command twice
+        return None
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    return reply.get("exit", 0)
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return
+
+        if request.get("control") == "ping":
+            reply = {"pid": os.getpid(), "started": self.server.started, "served": self.server.served}
+        elif request.get("control") == "shutdown":
+            reply = {"stopped": True}
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            reply = self._run_with_keepalive(request.get("argv", []))
+            if reply is None:
+                return
+            with self.server.lock:
+                self.server.served += 1
+        try:
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        except OSError:
+            pass  # the caller went away
+
+    def _run_with_keepalive(self, argv):
+        """
+        Acknowledge the command, run it on a worker thread and send keepalives
+        until it finishes. Returns its reply, or None if the caller went away.
+        """
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(self._run(argv)), daemon=True)
+        try:
+            self.wfile.write(b'{"accepted": true}\n')
+            self.wfile.flush()
+            worker.start()
+            while True:
+                worker.join(KEEPALIVE_INTERVAL)
+                if not worker.is_alive():
+                    return result
+                self.wfile.write(b'{"keepalive": true}\n')
+                self.wfile.flush()
+        except OSError:
+            return None
+
+    def _run(self, argv):
+        # Each request runs on its own thread; output is captured per thread
+        # (see _ThreadOutput), so concurrent commands never mix their output.
+        # Forwarded commands take no file paths, so the caller's cwd is not needed.
+        from erddap_cli.cli import build_parser
+        out, err = io.StringIO(), io.StringIO()
+        code = 0
+        with _capture_output(out, err):
+            try:
+                if argv and argv[0] in FORWARDABLE_COMMANDS:
+                    args = build_parser().parse_args(argv)
+                    args.func(args)
+                else:
+                    print(f"Command not supported by the daemon: {' '.join(argv)}", file=sys.stderr)
+                    code = 2
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                print(f"Error: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                # Write this command's requests to the journal now, not at daemon exit
+                from erddap_cli.client.journal import flush
+                flush()
+        return {"stdout": out.getvalue(), "stderr": err.getvalue(), "exit": code}
+
+
+class _ThreadOutput:
+    """
+    Stand-in for sys.stdout/sys.stderr that sends writes to the buffer of the
+    current thread's request, and to the real stream otherwise.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, "buffer", None) or self._stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextlib.contextmanager
+def _capture_output(out, err):
+    """Capture this thread's stdout/stderr into out/err."""
+    if not isinstance(sys.stdout, _ThreadOutput):
+        sys.stdout = _ThreadOutput(sys.stdout)
+    if not isinstance(sys.stderr, _ThreadOutput):
+        sys.stderr = _ThreadOutput(sys.stderr)
+    sys.stdout._local.buffer, sys.stderr._local.buffer = out, err
+    try:
+        yield
+    finally:
+        sys.stdout._local.buffer = sys.stderr._local.buffer = None
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # One thread per request, so a slow command does not hold up the others
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, _DaemonHandler)
+        self.started = time.time()
+        self.served = 0
+        self.lock = threading.Lock()
+
+
+def _ping():
+    try:
+        return _send_request({"control": "ping"}, timeout=5)
+    except (OSError, ValueError):
+        return None
+
+def serve_forever():
+    """Run the daemon in the current process until it receives a stop request."""
+    path = get_socket_path()
+    if os.path.exists(path):
+        if _ping():
+            print("Daemon is already running.")
+            return
+        os.remove(path)  # stale socket from a daemon that died
+
+    # Warm up: the heavy imports and the pooled HTTP session live for the
+    # lifetime of the daemon, along with the dataset info cache.
+    from erddap_cli.client.session import get_http_session
+    get_http_session()
+
+    sys.stdout, sys.stderr = _ThreadOutput(sys.stdout), _ThreadOutput(sys.stderr)
+    server = _DaemonServer(path)
+    os.chmod(path, 0o600)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def setup_daemon_command(subparsers):
+    """
+    Register the 'daemon' subcommand and its subcommands.
+    """
+    parser = subparsers.add_parser(
+        "daemon",
+        help="Run a background process that keeps connections and metadata warm (start/stop/status)."
+    )
+    daemon_subparsers = parser.add_subparsers(dest="daemon_command", required=False)
+    parser.set_defaults(func=handle_daemon_status)
+
+    start_parser = daemon_subparsers.add_parser("start", help="Start the daemon in the background.")
+    start_parser.add_argument(
+        "--foreground", action="store_true",
+        help="Run in the current terminal instead of detaching"
+    )
+    start_parser.set_defaults(func=handle_daemon_start)
+
+    stop_parser = daemon_subparsers.add_parser("stop", help="Stop the running daemon.")
+    stop_parser.set_defaults(func=handle_daemon_stop)
+
+    status_parser = daemon_subparsers.add_parser("status", help="Show whether the daemon is running.")
+    status_parser.set_defaults(func=handle_daemon_status)
+
+def handle_daemon_start(args):
+    if not daemon_supported():
+        print("The daemon needs Unix domain sockets, which this platform does not support.")
+        return
+    if args.foreground:
+        print(f"Daemon listening on {get_socket_path()} (Ctrl+C to stop)")
+        try:
+            serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if _ping():
+        print("Daemon is already running.")
+        return
+    subprocess.Popen(
+        [sys.executable, "-m", "erddap_cli.cli", "daemon", "start", "--foreground"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    for _ in range(100):
+        time.sleep(0.1)
+        status = _ping()
+        if status:
+            print(f"Daemon started (pid {status['pid']}) on {get_socket_path()}")
+            return
+    print("Daemon did not come up within 10 seconds.")
+
+def handle_daemon_stop(args):
+    if not daemon_supported() or not _ping():
+        print("Daemon is not running.")
+        return
+    try:
+        _send_request({"control": "shutdown"}, timeout=5)
+    except (OSError, ValueError):
+        pass
+    print("Daemon stopped.")
+
+def handle_daemon_status(args):
+    status = _ping() if daemon_supported() else None
+    if not status:
+        print("Daemon is not running.")
+        return
+    uptime = int(time.time() - status["started"])
+    print(f"Daemon running (pid {status['pid']}) on {get_socket_path()}")
+    print(f"    Uptime:          {uptime}s")
+    print(f"    Commands served: {status['served']}")
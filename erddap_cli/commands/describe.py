@@ -1,6 +1,7 @@
 # erddap_cli/commands/describe.py
 import argparse
 from erddap_cli.client.session import get_dataset_info
+from erddap_cli.client.mirrors import find_mirrors, call_with_failover
 
 def setup_describe_command(subparsers):
     """
@@ -32,6 +33,11 @@ def setup_describe_command(subparsers):
         default="text",
         help="Output format: text (default), json, or yaml"
     )
+    parser.add_argument(
+        "--mirrors",
+        action="store_true",
+        help="Query the fastest healthy known server that mirrors the dataset, failing over on errors"
+    )
     parser.set_defaults(func=handle_describe)
 
 def _print_unified_block(item, info_dict):
@@ -86,7 +92,14 @@ def handle_describe(args):
     """
     Handle the 'describe' command: fetch and print selected sections of dataset info.
     """
-    info = get_dataset_info(args.server, args.dataset_id)
+    mirrors = None
+    if getattr(args, "mirrors", False):
+        mirrors = find_mirrors(args.dataset_id, origin=args.server)
+        mirrors = mirrors or None
+    if mirrors:
+        args.server, info = call_with_failover(mirrors, get_dataset_info, args.dataset_id)
+    else:
+        info = get_dataset_info(args.server, args.dataset_id)
     protocol = 'griddap' if info.get('cdm_data_type', '').lower() == 'grid' else 'tabledap'
     section = args.section
     output_format = getattr(args, "output_format", "text")
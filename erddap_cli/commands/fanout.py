@@ -0,0 +1,190 @@
+# erddap_cli/commands/fanout.py
+
+import os
+import re
+import json
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from erddap_cli.client.api import ErddapClient
+
+# Coordinate variables carried along with the requested ones when present
+COORDINATE_VARS = ["time", "latitude", "longitude", "depth"]
+_CONSTRAINT_RE = re.compile(r"^\s*([A-Za-z_][\w]*)\s*(>=|<=|!=|=~|=|<|>)\s*(.+?)\s*$")
+
+
+def setup_fanout_command(subparsers):
+    """
+    Register the 'fanout' subcommand: search, then fetch the same variables
+    and constraints from every matching tabledap dataset.
+    """
+    parser = subparsers.add_parser(
+        "fanout",
+        help="Search, then fetch the same variables from every matching dataset into one partitioned output."
+    )
+    parser.add_argument("--server", required=True, help="Base ERDDAP server URL")
+    parser.add_argument("--query",  required=True, help="Search term (combine keywords with '+')")
+    parser.add_argument("--variables", required=True,
+                        help="Comma-separated variable names or standard_names, e.g. sea_water_temperature,sea_water_salinity")
+    parser.add_argument("--output-dir", required=True, help="Directory for the dataset_id=<id>/ partitions")
+    parser.add_argument("--min-lon",  type=float, help="Minimum Longitude")
+    parser.add_argument("--max-lon",  type=float, help="Maximum Longitude")
+    parser.add_argument("--min-lat",  type=float, help="Minimum Latitude")
+    parser.add_argument("--max-lat",  type=float, help="Maximum Latitude")
+    parser.add_argument("--min-time", type=str,   help="Minimum Time (ISO format)")
+    parser.add_argument("--max-time", type=str,   help="Maximum Time (ISO format)")
+    parser.add_argument("--constraint", action="append", default=[],
+                        help="Extra tabledap constraint applied to every dataset, e.g. \"depth<=10\" (repeatable)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.add_argument("--dry-run", action="store_true", help="Only resolve datasets and print the planned requests")
+    parser.set_defaults(func=handle_fanout)
+
+def _parse_constraints(items):
+    constraints = {}
+    for item in items:
+        m = _CONSTRAINT_RE.match(item)
+        if not m:
+            raise ValueError(f"Could not parse constraint {item!r}; use e.g. \"depth<=10\".")
+        constraints[f"{m.group(1)}{m.group(2)}"] = m.group(3)
+    return constraints
+
+def _resolve_variables(info, wanted):
+    """
+    Map each requested name to a variable of the dataset, matching the
+    variable name first, then its standard_name. Returns None if any is missing.
+    """
+    by_name = {v["name"]: v["name"] for v in info.get("variables", [])}
+    by_standard = {}
+    for v in info.get("variables", []):
+        if v.get("standard_name"):
+            by_standard.setdefault(v["standard_name"], v["name"])
+    mapping = {}
+    for name in wanted:
+        actual = by_name.get(name) or by_standard.get(name)
+        if actual is None:
+            return None
+        mapping[name] = actual
+    return mapping
+
+def _plan_request(client, dataset_id, info, wanted, args, extra_constraints):
+    """Build the tabledap URL and column renames for one dataset, or None if it lacks a variable."""
+    mapping = _resolve_variables(info, wanted)
+    if mapping is None:
+        return None
+    names = {v["name"] for v in info.get("variables", [])}
+    coords = [c for c in COORDINATE_VARS if c in names and c not in mapping.values()]
+    variables = coords + list(mapping.values())
+
+    # Search bounds also constrain the rows, where the dataset has the coordinate
+    constraints = {}
+    for var, op, value in (
+        ("longitude", ">=", args.min_lon), ("longitude", "<=", args.max_lon),
+        ("latitude",  ">=", args.min_lat), ("latitude",  "<=", args.max_lat),
+        ("time",      ">=", args.min_time), ("time",     "<=", args.max_time),
+    ):
+        if value is not None and var in names:
+            constraints[f"{var}{op}"] = value
+    for key, value in extra_constraints.items():
+        var = re.match(r"[A-Za-z_]\w*", key).group(0)
+        actual = mapping.get(var, var)
+        if actual not in names:
+            return None
+        constraints[f"{actual}{key[len(var):]}"] = value
+
+    url = client.tabledap_url(dataset_id, variables, constraints)
+    renames = {actual: name for name, actual in mapping.items() if actual != name}
+    return {"url": url, "renames": renames}
+
+def _fetch_partition(client, dataset_id, plan, output_dir):
+    """Fetch one dataset into output_dir/dataset_id=<id>/part-0.csv. Returns the row count."""
+    try:
+        df = client.data(plan["url"])
+    except requests.HTTPError as e:
+        # ERDDAP answers 404 when the constraints match no rows
+        if e.response is not None and e.response.status_code == 404:
+            return 0
+        raise
+    if df.empty:
+        return 0
+    df = df.rename(columns=plan["renames"])
+    part_dir = os.path.join(output_dir, f"dataset_id={dataset_id}")
+    os.makedirs(part_dir, exist_ok=True)
+    df.to_csv(os.path.join(part_dir, "part-0.csv"), index=False)
+    return len(df)
+
+def handle_fanout(args):
+    wanted = [v.strip() for v in args.variables.split(",") if v.strip()]
+    try:
+        extra_constraints = _parse_constraints(args.constraint)
+    except ValueError as e:
+        print(e)
+        return
+    bounds = dict(
+        min_lon=args.min_lon, max_lon=args.max_lon, min_lat=args.min_lat, max_lat=args.max_lat,
+        min_time=args.min_time, max_time=args.max_time,
+    )
+
+    with ErddapClient(args.server, pool_size=args.workers) as client:
+        # 1. Resolve matching datasets (tabledap only)
+        results = client.search_all(args.query, **bounds)
+        dataset_ids = [
+            str(r.get("Dataset ID")) for r in results
+            if isinstance(r.get("tabledap"), str) and r.get("tabledap").strip()
+        ]
+        print(f"\nSearch matched {len(results)} datasets, {len(dataset_ids)} offer tabledap.")
+        if not dataset_ids:
+            return
+
+        # 2. Check each dataset's metadata for the requested variables
+        plans, status = {}, {}
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(client.info, did): did for did in dataset_ids}
+            for future in as_completed(futures):
+                did = futures[future]
+                try:
+                    plan = _plan_request(client, did, future.result(), wanted, args, extra_constraints)
+                except Exception as e:
+                    status[did] = {"status": "error", "error": f"info: {e}"}
+                    continue
+                if plan is None:
+                    status[did] = {"status": "skipped", "error": "missing requested variables"}
+                else:
+                    plans[did] = plan
+
+        print(f"{len(plans)} datasets have all of: {', '.join(wanted)}")
+        if args.dry_run:
+            for did, plan in sorted(plans.items()):
+                print(f"- {did}: {plan['url']}")
+            return
+
+        # 3. Fetch every dataset concurrently; one failure does not stop the rest
+        os.makedirs(args.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(_fetch_partition, client, did, plan, args.output_dir): did
+                for did, plan in plans.items()
+            }
+            for future in as_completed(futures):
+                did = futures[future]
+                try:
+                    rows = future.result()
+                    status[did] = {"status": "ok" if rows else "empty", "rows": rows, "url": plans[did]["url"]}
+                    print(f"- {did}: {rows} rows")
+                except Exception as e:
+                    status[did] = {"status": "error", "error": str(e), "url": plans[did]["url"]}
+                    print(f"- {did}: failed ({e})")
+
+    elapsed = time.perf_counter() - start
+    manifest = {
+        "server": args.server, "query": args.query, "variables": wanted,
+        "constraints": extra_constraints, "bounds": bounds, "datasets": status,
+    }
+    with open(os.path.join(args.output_dir, "_manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    counts = {}
+    for entry in status.values():
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    summary = ", ".join(f"{n} {s}" for s, n in sorted(counts.items()))
+    print(f"\nDone in {elapsed:.1f}s: {summary}. Output in {args.output_dir}")
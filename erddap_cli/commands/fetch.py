@@ -1,9 +1,26 @@
 # erddap_cli/commands/fetch.py
 
 import argparse
+import contextlib
+import io
+import re
+import numpy as np
 import pandas as pd
+import requests
 import urllib.error
-from erddap_cli.client.session import get_dataset_info
+from concurrent.futures import ThreadPoolExecutor
+from erddap_cli.client.session import (
+    get_dataset_info, build_griddap_url, build_tabledap_url, read_csv_url, get_http_session, HTTP_TIMEOUT
+)
+from erddap_cli.client.store import constraints_to_bounds, cacheable_bounds, answer_query, save_frame, split_units
+from erddap_cli.client.parallel_csv import read_csv_parallel, write_csv
+from erddap_cli.client.dods import fetch_griddap_arrays, fetch_griddap_to_memmap
+from erddap_cli.client.mirrors import find_mirrors, call_with_failover, record_request, swap_server
+from erddap_cli.client.journal import record_cache_hit, cache_miss
+from erddap_cli.client.matchup import fetch_axes
+from erddap_cli.client.polygon import (
+    load_polygon, shift_longitudes, points_in_polygon, tabledap_boxes, griddap_boxes
+)
 
 # --- Low-Level Helper Functions ---
 
@@ -34,8 +51,182 @@ def _get_var_actual_range(varname, variables_list):
                     return _clean_val(parts[0]), _clean_val(parts[1])
     return '', ''
 
-def _fetch_and_process_data(url: str, output_path: str = None):
-    """Fetches data from the final URL, shows a preview, and optionally saves."""
+# Rows shown by the preview step (the first one is ERDDAP's units row)
+PREVIEW_ROWS = 5
+
+# ERDDAP server-side reductions exposed as fetch options: argparse dest -> filter name
+REDUCTIONS = {
+    "order_by_mean":    "orderByMean",
+    "order_by_min":     "orderByMin",
+    "order_by_max":     "orderByMax",
+    "order_by_closest": "orderByClosest",
+    "order_by_count":   "orderByCount",
+    "order_by_limit":   "orderByLimit",
+}
+
+def _build_reduction_filters(args, variables: list, selected_vars: list):
+    """
+    Validates the requested server-side reductions against the dataset's variables
+    and returns (filters, selected_vars). ERDDAP only accepts orderBy variables that
+    are part of the result, so any that are missing get added to the selection.
+    Raises ValueError for specs the server would reject.
+    """
+    known = {v.get('name') for v in variables}
+    time_vars = {v.get('name') for v in variables
+                 if 'since' in str(v.get('units', '')).lower() or str(v.get('name', '')).lower() == 'time'}
+    selected_vars = list(selected_vars)
+    filters = []
+
+    for dest, func in REDUCTIONS.items():
+        spec = getattr(args, dest, None)
+        if not spec:
+            continue
+        items = [item.strip() for item in spec.split(',') if item.strip()]
+
+        if func == "orderByLimit":
+            if not items or not items[-1].isdigit() or int(items[-1]) < 1:
+                raise ValueError(f"{func} needs a positive row limit as its last item, e.g. \"station,5\".")
+            var_items = items[:-1]
+        else:
+            if not items:
+                raise ValueError(f"{func} needs at least one variable.")
+            var_items = items
+        if func == "orderByClosest" and '/' not in var_items[-1]:
+            raise ValueError(f"{func} needs an interval on its last variable, e.g. \"station,time/2hours\".")
+
+        for item in var_items:
+            name, _, interval = item.partition('/')
+            if name not in known:
+                raise ValueError(f"{func}: '{name}' is not a variable of this dataset.")
+            if interval:
+                # Numeric rounding (depth/10) or time rounding (time/1hour, time/15minutes)
+                m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([A-Za-z]*)(?::(-?\d+(?:\.\d+)?))?", interval.strip())
+                if not m:
+                    raise ValueError(f"{func}: invalid interval '{interval}' for '{name}'.")
+                if m.group(2) and name not in time_vars:
+                    raise ValueError(f"{func}: time units in '{item}' only apply to time variables.")
+            if name not in selected_vars:
+                print(f"Adding '{name}' to the selected variables (required by {func}).")
+                selected_vars.append(name)
+
+        filters.append(f'{func}(%22{",".join(items)}%22)')
+
+    if getattr(args, "distinct", False):
+        filters.append("distinct()")
+    return filters, selected_vars
+
+def _read_head(url: str, nrows: int):
+    """
+    Streams the CSV at url and stops after nrows rows, closing the connection
+    instead of downloading the rest. Errors are raised as urllib errors so they
+    share the handling of full reads.
+    """
+    try:
+        resp = get_http_session().get(url, stream=True, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        raise urllib.error.URLError(e)
+    with resp:
+        if resp.status_code != 200:
+            raise urllib.error.HTTPError(url, resp.status_code, resp.reason, resp.headers, io.BytesIO(resp.content))
+        resp.raw.decode_content = True
+        return pd.read_csv(resp.raw, nrows=nrows)
+
+def _download(url: str) -> bytes:
+    """Downloads the response body at url, raising urllib errors like _read_head."""
+    try:
+        resp = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        raise urllib.error.URLError(e)
+    if resp.status_code != 200:
+        raise urllib.error.HTTPError(url, resp.status_code, resp.reason, resp.headers, io.BytesIO(resp.content))
+    return resp.content
+
+def _read_text(data: bytes):
+    """Parses a CSV body keeping every value as the server's text, so saving it reproduces the response."""
+    return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+
+def _read_with_failover(url: str, mirrors: list = None, nrows: int = None, reader=None):
+    """
+    Reads the CSV at url (only the first nrows rows when given), or returns
+    reader(url) when a reader is given. When mirrors are given (ranked, with
+    the server the URL was built against first), connection failures and
+    server-side 5xx errors fall over to the next mirror.
+    """
+    candidates = [(None, url)]
+    if mirrors:
+        candidates = [(mirrors[0], url)] + [(m, swap_server(url, mirrors[0], m)) for m in mirrors[1:]]
+
+    for attempt, (server, candidate_url) in enumerate(candidates):
+        encoded_url = candidate_url.replace('>=', '%3E=').replace('<=', '%3C=')
+        is_last = attempt == len(candidates) - 1
+        try:
+            if reader is not None:
+                df = reader(encoded_url)
+            else:
+                df = _read_text(_download(encoded_url)) if nrows is None else _read_head(encoded_url, nrows)
+        except urllib.error.HTTPError as e:
+            # 4xx means the query itself was rejected; another mirror won't help
+            if server is None or e.code < 500 or is_last:
+                raise
+            record_request(server, None, False)
+            print(f"Server {server} returned HTTP {e.code}, failing over to {candidates[attempt + 1][0]}")
+            continue
+        except urllib.error.URLError as e:
+            if server is None or is_last:
+                raise
+            record_request(server, None, False)
+            print(f"Server {server} unreachable ({e.reason}), failing over to {candidates[attempt + 1][0]}")
+            continue
+        if server is not None:
+            record_request(server, None, True)
+        return df
+
+def _server_error_message(e: urllib.error.HTTPError) -> str:
+    """Pulls the human-readable message out of an ERDDAP error response."""
+    error_body = e.read().decode('utf-8', errors='ignore')
+    for line in error_body.splitlines():
+        if '<b>Message</b>' in line:
+            message = line.strip().replace('<p>', '').replace('</p>', '').replace('<b>Message</b>', '').strip()
+            return f"Server Error: {message}"
+    # Plain-text errors look like: Error { code=404; message="..."; }
+    m = re.search(r'message="(.*?)";?\s*$', error_body, re.M | re.S)
+    if m:
+        return f"Server Error: {m.group(1)}"
+    return f"Error fetching data: {e}"
+
+def _preview_slices(slices: list, nrows: int = PREVIEW_ROWS) -> list:
+    """
+    Shrinks griddap slices for a preview: every dimension is cut to its first
+    value, except the last, which keeps up to nrows index steps.
+    """
+    preview = []
+    for i, sl in enumerate(slices):
+        inner = sl.strip()[1:-1] if sl.strip().startswith('[') and sl.strip().endswith(']') else None
+        m = re.match(r"\s*(\([^)]*\)|[^:]+)(?::\s*([^:]+?))?(?::\s*(.+))?\s*$", inner or '')
+        if not m:
+            preview.append(sl)
+            continue
+        start, stride, stop = m.group(1).strip(), m.group(2), m.group(3)
+        if stop is None and stride is not None:
+            stride, stop = '1', stride  # [start:stop]
+        is_last = i == len(slices) - 1
+        if is_last and start.isdigit() and stop and stop.strip().isdigit() and stride.strip().isdigit():
+            stop = min(int(stop), int(start) + int(stride) * (nrows - 1))
+            preview.append(f"[{start}:{stride.strip()}:{stop}]")
+        else:
+            preview.append(f"[{start}]")
+    return preview
+
+def _fetch_and_process_data(url: str, output_path: str = None, mirrors: list = None, preview_url: str = None,
+                            on_result=None, workers: int = 1):
+    """
+    Shows a cheap preview of the query, then fetches the full result on
+    confirmation and optionally saves it. preview_url is a reduced form of url
+    (server-side row limit or shrunk slices); the preview stream is closed after
+    PREVIEW_ROWS rows either way. With workers > 1 the full result is parsed on
+    that many cores. on_result, if given, receives the full result and its
+    units (None when the units are still the first row).
+    """
     print(f"\nQuery URL:\n{url}\n")
 
     preview = input("Fetch and preview data? [y/N]: ").strip().lower()
@@ -44,42 +235,204 @@ def _fetch_and_process_data(url: str, output_path: str = None):
         return
 
     try:
-        encoded_url = url.replace('>=', '%3E=').replace('<=', '%3C=')
-        df = pd.read_csv(encoded_url)
+        head = _read_with_failover(preview_url or url, mirrors, nrows=PREVIEW_ROWS)
+        if head.empty:
+            print("Your query is valid but produced no matching results.")
+            return
+        print(f"\nData preview (first {PREVIEW_ROWS} rows):")
+        print(head.to_string(index=False))
+
+        target = f" and save it to {output_path}" if output_path else ""
+        full = input(f"\nDownload the full result{target}? [y/N]: ").strip().lower()
+        if full != 'y':
+            print("Full download skipped.")
+            return
 
+        if workers > 1:
+            df, units = _read_with_failover(url, mirrors, reader=lambda u: read_csv_parallel(_download(u), workers))
+            rows = len(df)
+        else:
+            df, units = _read_with_failover(url, mirrors), None
+            # The first row holds the units
+            rows = len(df) - 1
         if not df.empty:
-            print("\nData preview (first 5 rows):")
-            print(df.head().to_string(index=False))
+            print(f"\nFetched {rows} rows.")
             if output_path:
-                df.to_csv(output_path, index=False)
+                if units is None:
+                    df.to_csv(output_path, index=False)
+                else:
+                    write_csv(df, units, output_path)
                 print(f"\nData successfully saved to {output_path}")
+            if on_result:
+                on_result(df, units)
         else:
             print("Your query is valid but produced no matching results.")
 
     except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8', errors='ignore')
-        final_message = f"Error fetching data: {e}"
-        for line in error_body.splitlines():
-            if '<b>Message</b>' in line:
-                message = line.strip().replace('<p>', '').replace('</p>', '').replace('<b>Message</b>', '').strip()
-                final_message = f"Server Error: {message}"
-                break
-        print(f"\n{final_message}")
+        if e.code == 404:
+            print("\nYour query is valid but produced no matching results.")
+            return
+        print(f"\n{_server_error_message(e)}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def _fetch_griddap_binary(server: str, dataset_id: str, selected_vars: list, slices: list, output_path: str = None,
+                          memmap_dir: str = None, tile_size: int = 10, mirrors: list = None):
+    """Fetches a griddap subset as binary .dods and decodes it straight into NumPy arrays."""
+    url = build_griddap_url(server, dataset_id, selected_vars, slices, "dods")
+    print(f"\nQuery URL:\n{url}\n")
+
+    confirm = input("Fetch binary data? [y/N]: ").strip().lower()
+    if confirm != 'y':
+        print("Fetch cancelled.")
+        return
+
+    try:
+        if memmap_dir:
+            def progress(done, total):
+                print(f"    Tiles written: {done}/{total} steps of the first dimension")
+            arrays = fetch_griddap_to_memmap(server, dataset_id, selected_vars, slices, memmap_dir, tile_size, progress)
+        elif mirrors:
+            _, arrays = call_with_failover(mirrors, fetch_griddap_arrays, dataset_id, selected_vars, slices)
+        else:
+            arrays = fetch_griddap_arrays(server, dataset_id, selected_vars, slices)
+    except Exception as e:
+        print(f"\nError fetching binary data: {e}")
+        return
+
+    print("\nDecoded arrays:")
+    for name, arr in arrays.items():
+        print(f"  {name}: shape={arr.shape}, dtype={arr.dtype}")
+
+    if memmap_dir:
+        print(f"\nArrays saved as .npy memmaps in {memmap_dir} (load with numpy.load(path, mmap_mode='r'))")
+    elif output_path:
+        np.savez(output_path, **arrays)
+        print(f"\nData successfully saved to {output_path}")
+
 # --- Protocol-Specific Workflow Functions ---
 
-def _tabledap_workflow(info: dict, server: str, dataset_id: str, selected_vars: list, output_path: str):
-    """Handles the query-building and fetching process for tabledap."""
-    print("\n--- Specify Tabledap Constraints (min/max) ---")
-    print("Press Enter to skip any constraint.\n")
+def _answer_from_store(server: str, dataset_id: str, selected_vars: list, bounds: dict, output_path: str) -> bool:
+    """
+    Tries to answer a tabledap query from previously fetched results, fetching
+    only the missing slices if needed. Returns True when the query was answered.
+    """
+    def fetch_slice(variables, slice_constraints):
+        return read_csv_url(build_tabledap_url(server, dataset_id, variables, slice_constraints),
+                            dtype=str, keep_default_na=False)
+
+    try:
+        df = answer_query(server, dataset_id, selected_vars, bounds, fetch_slice)
+    except Exception as e:
+        print(f"Local store lookup failed ({e}), querying the server instead.")
+        return False
+    if df is None:
+        return False
+    record_cache_hit(server, "tabledap.csv")
+
+    # The first row holds the units
+    if len(df) <= 1:
+        print("Your query is valid but produced no matching results.")
+        return True
+    print(f"\nData preview (first {PREVIEW_ROWS} rows):")
+    print(df.head(PREVIEW_ROWS).to_string(index=False))
+    print(f"\n{len(df) - 1} rows.")
+    if output_path:
+        df.to_csv(output_path, index=False)
+        print(f"\nData successfully saved to {output_path}")
+    return True
+
+def _find_coordinate(names: list, candidates: tuple):
+    """Returns the first name in names that matches one of candidates (case-insensitive), or None."""
+    return next((n for n in names if n.lower() in candidates), None)
+
+def _fetch_polygon(urls: list, polygons: list, lon_col: str, lat_col: str, output_path: str = None,
+                   mirrors: list = None, workers: int = 8):
+    """
+    Fetches the bounding-box requests covering a polygon concurrently, then
+    keeps only the rows whose lon/lat fall inside it. The boxes never overlap,
+    so every row arrives at most once and needs no deduplication.
+    """
+    print(f"\nPolygon covered by {len(urls)} bounding-box request(s). First query URL:\n{urls[0]}\n")
+
+    confirm = input(f"Fetch all {len(urls)} requests and clip to the polygon? [y/N]: ").strip().lower()
+    if confirm != 'y':
+        print("Fetch cancelled.")
+        return
+
+    def fetch_box(url):
+        try:
+            return split_units(_read_with_failover(url, mirrors))
+        except urllib.error.HTTPError as e:
+            # ERDDAP answers an empty box with 404
+            if e.code == 404:
+                return None
+            raise
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+            parts = [part for part in pool.map(fetch_box, urls) if part is not None and not part[0].empty]
+    except urllib.error.HTTPError as e:
+        print(f"\n{_server_error_message(e)}")
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        return
+
+    if not parts:
+        print("Your query is valid but produced no matching results.")
+        return
+    units = parts[0][1]
+    df = pd.concat([frame for frame, _ in parts], ignore_index=True)
+    fetched = len(df)
+    lons = pd.to_numeric(df[lon_col], errors="coerce").to_numpy(dtype=float)
+    lats = pd.to_numeric(df[lat_col], errors="coerce").to_numpy(dtype=float)
+    df = df[points_in_polygon(lons, lats, polygons)]
+    df = df.reset_index(drop=True)
+    if df.empty:
+        print(f"Fetched {fetched} rows, none of them inside the polygon.")
+        return
+
+    print(f"\nData preview (first {PREVIEW_ROWS} rows):")
+    print(df.head(PREVIEW_ROWS).to_string(index=False))
+    print(f"\nFetched {fetched} rows, {len(df)} inside the polygon.")
+    if output_path:
+        write_csv(df, units, output_path)
+        print(f"\nData successfully saved to {output_path}")
 
+def _tabledap_workflow(info: dict, server: str, dataset_id: str, selected_vars: list, output_path: str, mirrors: list = None,
+                       filters: list = None, use_store: bool = False, workers: int = 1, polygon: list = None):
+    """Handles the query-building and fetching process for tabledap."""
     variables = info.get('variables', [])
     global_attrs = info.get('global_attrs', {})
     constraints = {}
 
+    # A polygon replaces the latitude/longitude constraints
+    coords = ()
+    if polygon:
+        names = [v.get('name', '') for v in variables]
+        lon_col = _find_coordinate(names, ('longitude', 'lon'))
+        lat_col = _find_coordinate(names, ('latitude', 'lat'))
+        if not lon_col or not lat_col:
+            print("This dataset has no longitude/latitude variables to clip to a polygon.")
+            return
+        coords = (lon_col, lat_col)
+        selected_vars = selected_vars + [c for c in coords if c not in selected_vars]
+        # Match the polygon to datasets whose longitudes run 0..360
+        _, lon_max = _get_var_actual_range(lon_col, variables)
+        try:
+            if float(lon_max) > 180:
+                polygon = shift_longitudes(polygon, to_360=True)
+        except ValueError:
+            pass
+
+    print("\n--- Specify Tabledap Constraints (min/max) ---")
+    print("Press Enter to skip any constraint.\n")
+
     for var_name in selected_vars:
+        if var_name in coords:
+            print(f"- Variable: {var_name}: constrained by the polygon.")
+            continue
         v_info = next((v for v in variables if v.get('name') == var_name), {})
         units = v_info.get('units', '')
         is_time = 'since' in units.lower() or var_name.lower() == 'time'
@@ -110,13 +463,62 @@ def _tabledap_workflow(info: dict, server: str, dataset_id: str, selected_vars:
     for key, value in constraints.items():
         constraint_parts.append(f"{key}{value}")
 
+    # Server-side reductions (orderByMean, distinct, ...) go after the constraints
+    constraint_parts.extend(filters or [])
+
     constraint_string = "&" + "&".join(constraint_parts) if constraint_parts else ""
     url = f"{server.rstrip('/')}/tabledap/{dataset_id}.csv?{variable_string}{constraint_string}"
 
-    _fetch_and_process_data(url, output_path)
+    if polygon:
+        # Half-open boxes (>= lower, < upper) so rows on a shared edge are fetched once
+        lon_col, lat_col = coords
+        urls = [
+            f"{url}&{lon_col}>={x0!r}&{lon_col}%3C{x1!r}&{lat_col}>={y0!r}&{lat_col}%3C{y1!r}"
+            for x0, x1, y0, y1 in tabledap_boxes(polygon)
+        ]
+        _fetch_polygon(urls, polygon, lon_col, lat_col, output_path, mirrors)
+        return
+
+    # Let the server cut the preview short, unless a reduction already shapes the result
+    preview_url = None if filters else f"{url}&orderByLimit(%22{PREVIEW_ROWS}%22)"
 
-def _griddap_workflow(info: dict, server: str, dataset_id: str, selected_vars: list, dims: list, output_path: str):
+    # Reductions change what the rows mean, so only plain subsets use the store
+    keep_result = None
+    bounds = constraints_to_bounds(constraints)
+    if use_store and not filters and not cacheable_bounds(bounds):
+        print("Note: relative constraints such as now-7days are not stored; querying the server.")
+    elif use_store and not filters:
+        if _answer_from_store(server, dataset_id, selected_vars, bounds, output_path):
+            return
+
+        def save_to_store(df, units):
+            if units is None:
+                df, units = split_units(df)
+            save_frame(server, dataset_id, selected_vars, bounds, df, units)
+            print("Result kept in the local store for later subset queries.")
+        keep_result = save_to_store
+
+    # With the store on, reaching the server means the store missed
+    with cache_miss() if keep_result else contextlib.nullcontext():
+        _fetch_and_process_data(url, output_path, mirrors, preview_url, keep_result, workers)
+
+def _griddap_workflow(info: dict, server: str, dataset_id: str, selected_vars: list, dims: list, output_path: str, mirrors: list = None,
+                      binary: bool = False, memmap_dir: str = None, tile_size: int = 10, workers: int = 1,
+                      polygon: list = None):
     """Handles the query-building and fetching process for griddap."""
+    coords = ()
+    if polygon:
+        names = [d.get('name', '') for d in dims]
+        lon_col = _find_coordinate(names, ('longitude', 'lon'))
+        lat_col = _find_coordinate(names, ('latitude', 'lat'))
+        if not lon_col or not lat_col:
+            print("This dataset has no longitude/latitude dimensions to clip to a polygon.")
+            return
+        coords = (lon_col, lat_col)
+        if binary or memmap_dir:
+            print("Note: polygon fetches are clipped row by row and always use CSV; --binary is ignored.")
+            binary, memmap_dir = False, None
+
     print("\n--- Specify Griddap Slices for Each Dimension ---")
     print("Use [start:stride:stop] index notation. You can use exact values for start/stop.\n Stride is based on data spacing.")
     print("Example for Index: [0:1:100]")
@@ -130,6 +532,9 @@ def _griddap_workflow(info: dict, server: str, dataset_id: str, selected_vars: l
         nvalues = int(dim.get('nvalues')) - 1 # Subtract 1 to stay in slicing bounds
         spacing = dim.get('average_spacing')
         dim_name = dim.get('name', '')
+        if dim_name in coords:
+            print(f"\n- Dimension: {dim_name}: sliced by the polygon.")
+            continue
         is_time = dim_name.lower() == 'time'
         min_v, max_v = '', ''
 
@@ -162,13 +567,55 @@ def _griddap_workflow(info: dict, server: str, dataset_id: str, selected_vars: l
             slices[dim_name] = default_slice
             print(f"    -> No input given, using default full range slice: {default_slice}")
 
+    if binary or memmap_dir:
+        _fetch_griddap_binary(server, dataset_id, selected_vars, list(slices.values()), output_path, memmap_dir, tile_size, mirrors)
+        return
+
+    if polygon:
+        _griddap_polygon(server, dataset_id, selected_vars, dims, slices, polygon, coords, output_path, mirrors)
+        return
+
     # Build URL
     slice_string = "".join(slices.values())
     sliced_vars = [f"{var}{slice_string}" for var in selected_vars]
     query_string = ",".join(sliced_vars)
     url = f"{server.rstrip('/')}/griddap/{dataset_id}.csv?{query_string}"
 
-    _fetch_and_process_data(url, output_path)
+    preview_slices = "".join(_preview_slices(list(slices.values())))
+    preview_url = f"{server.rstrip('/')}/griddap/{dataset_id}.csv?{','.join(f'{var}{preview_slices}' for var in selected_vars)}"
+
+    _fetch_and_process_data(url, output_path, mirrors, preview_url, workers=workers)
+
+def _griddap_polygon(server: str, dataset_id: str, selected_vars: list, dims: list, slices: dict, polygon: list,
+                     coords: tuple, output_path: str = None, mirrors: list = None):
+    """
+    Splits a polygon into disjoint latitude/longitude index boxes sized to the
+    dataset's own grid and fetches them with the other dimensions' slices.
+    """
+    lon_col, lat_col = coords
+    by_name = {d.get('name'): d for d in dims}
+    try:
+        axes = fetch_axes(server, dataset_id, [by_name[lat_col], by_name[lon_col]])
+    except Exception as e:
+        print(f"Could not read the {lat_col}/{lon_col} axes: {e}")
+        return
+    # Match the polygon to datasets whose longitudes run 0..360
+    if np.nanmax(axes[lon_col]) > 180:
+        polygon = shift_longitudes(polygon, to_360=True)
+
+    boxes = griddap_boxes(polygon, axes[lat_col], axes[lon_col])
+    if not boxes:
+        print("The polygon does not overlap the dataset's grid.")
+        return
+
+    urls = []
+    for (lat0, lat1), (lon0, lon1) in boxes:
+        box_slices = dict(slices)
+        box_slices[lat_col] = f"[{lat0}:1:{lat1}]"
+        box_slices[lon_col] = f"[{lon0}:1:{lon1}]"
+        slice_string = "".join(box_slices[d.get('name')] for d in dims)
+        urls.append(f"{server.rstrip('/')}/griddap/{dataset_id}.csv?{','.join(f'{var}{slice_string}' for var in selected_vars)}")
+    _fetch_polygon(urls, polygon, lon_col, lat_col, output_path, mirrors)
 
 # --- Main Command Logic ---
 
@@ -182,18 +629,83 @@ def setup_fetch_command(subparsers):
         "--output",
         help="Optional: Path to save the fetched data as a CSV file. (e.g. ./csvout.csv)"
     )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="Answer tabledap queries from previously fetched results when they cover them, and keep new results."
+    )
+    parser.add_argument(
+        "--mirrors",
+        action="store_true",
+        help="Find known servers that mirror the dataset, use the fastest healthy one and fail over on errors."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse the full CSV result on this many CPU cores (default: 1, a single pandas read)."
+    )
+    parser.add_argument(
+        "--polygon",
+        metavar="FILE",
+        help="Only keep data inside the Polygon/MultiPolygon in this GeoJSON file (lon/lat, fetched as a few covering boxes)."
+    )
+    reductions = parser.add_argument_group(
+        "server-side reductions (tabledap only)",
+        "Have the server aggregate rows before sending them. Variables may carry a rounding interval, "
+        "e.g. \"station,time/1hour\"."
+    )
+    reductions.add_argument("--order-by-mean",    metavar="VARS", help="Mean of the other columns per group (orderByMean)")
+    reductions.add_argument("--order-by-min",     metavar="VARS", help="Row with the minimum last variable per group (orderByMin)")
+    reductions.add_argument("--order-by-max",     metavar="VARS", help="Row with the maximum last variable per group (orderByMax)")
+    reductions.add_argument("--order-by-closest", metavar="VARS", help="Row closest to each interval of the last variable (orderByClosest)")
+    reductions.add_argument("--order-by-count",   metavar="VARS", help="Count of non-missing values per group (orderByCount)")
+    reductions.add_argument("--order-by-limit",   metavar="VARS,N", help="First N rows per group (orderByLimit)")
+    reductions.add_argument("--distinct",         action="store_true", help="Only return distinct rows (distinct())")
+    binary = parser.add_argument_group(
+        "binary griddap",
+        "Request griddap data as binary OPeNDAP (.dods) and decode it directly into NumPy arrays instead of CSV."
+    )
+    binary.add_argument("--binary", action="store_true", help="Use the binary path; --output is then written as .npz")
+    binary.add_argument("--memmap-dir", help="Assemble the arrays into .npy memmaps in this directory, tile by tile (implies --binary)")
+    binary.add_argument("--tile-size", type=int, default=10, help="Steps of the first dimension fetched per request with --memmap-dir (default: 10)")
     parser.set_defaults(func=handle_fetch)
 
 def handle_fetch(args):
     """Main dispatcher function for the interactive fetch command."""
     print("\n--- ERDDAP Interactive Query Builder ---")
 
+    polygon = None
+    if getattr(args, "polygon", None):
+        try:
+            polygon = load_polygon(args.polygon)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"Could not read polygon from {args.polygon}: {e}")
+            return
+
     # 1. Common Steps: Get server, dataset, and metadata
     server = input("Enter ERDDAP server URL: ").strip()
     dataset_id = input("Enter dataset ID: ").strip()
-    
+
+    mirrors = None
+    if getattr(args, "mirrors", False):
+        mirrors = find_mirrors(dataset_id, origin=server)
+        if not mirrors:
+            print("No reachable server carries this dataset, using the server as entered.")
+            mirrors = None
+        else:
+            print(f"Found {len(mirrors)} server(s) with {dataset_id}, fastest first:")
+            for m in mirrors:
+                print(f"  - {m}")
+
     try:
-        info = get_dataset_info(server, dataset_id)
+        if mirrors:
+            server, info = call_with_failover(mirrors, get_dataset_info, dataset_id)
+            # Keep the server that answered at the front of the failover order
+            mirrors = [server] + [m for m in mirrors if m != server]
+            print(f"Using server: {server}")
+        else:
+            info = get_dataset_info(server, dataset_id)
     except Exception as e:
         print(f"Failed to fetch dataset info: {e}")
         return
@@ -221,6 +733,22 @@ def handle_fetch(args):
             print("Invalid variable selection.")
             return
 
+    # 3b. Validate any server-side reductions against the dataset
+    filters = []
+    if protocol == 'tabledap':
+        try:
+            filters, selected_vars = _build_reduction_filters(args, variables, selected_vars)
+        except ValueError as e:
+            print(f"Invalid reduction: {e}")
+            return
+        if polygon and filters:
+            print("Server-side reductions cannot be combined with --polygon: rows are clipped after they arrive.")
+            return
+    elif any(getattr(args, dest, None) for dest in REDUCTIONS) or getattr(args, "distinct", False):
+        print("Note: server-side reductions only apply to tabledap and are ignored for griddap.")
+    if protocol == 'tabledap' and (args.binary or args.memmap_dir):
+        print("Note: binary output only applies to griddap; tabledap results are fetched as CSV.")
+
     # 4. Re-integrate fallback logic for identifying dimensions
     dims = info.get('dimensions', [])
     if not dims:
@@ -229,8 +757,10 @@ def handle_fetch(args):
 
     # 5. Diverge: Call the specific workflow based on protocol
     if protocol == 'tabledap':
-        _tabledap_workflow(info, server, dataset_id, selected_vars, args.output)
+        _tabledap_workflow(info, server, dataset_id, selected_vars, args.output, mirrors, filters, args.store, args.workers,
+                           polygon)
     elif protocol == 'griddap':
-        _griddap_workflow(info, server, dataset_id, selected_vars, dims, args.output)
+        _griddap_workflow(info, server, dataset_id, selected_vars, dims, args.output, mirrors,
+                          args.binary, args.memmap_dir, args.tile_size, args.workers, polygon)
     else:
         print(f"Error: Unknown protocol '{protocol}'. Please choose 'tabledap' or 'griddap'.")
\ No newline at end of file
@@ -0,0 +1,124 @@
+# erddap_cli/commands/harvest.py
+
+import json
+import datetime
+from erddap_cli.client.session import list_known_servers
+from erddap_cli.client.harvest import open_index, harvest_server, query_index, index_summary, get_index_path
+
+
+def setup_harvest_command(subparsers):
+    """
+    Register the 'harvest' subcommand and its subcommands.
+    """
+    parser = subparsers.add_parser(
+        "harvest",
+        help="Harvest dataset metadata into a local index and query it offline (run/query)."
+    )
+    harvest_subparsers = parser.add_subparsers(dest="harvest_command", required=False)
+    parser.set_defaults(func=handle_harvest_summary)
+
+    # Run
+    run_parser = harvest_subparsers.add_parser(
+        "run",
+        help="Fetch info for every dataset on one or more servers into the index."
+    )
+    run_parser.add_argument("--server", action="append", help="ERDDAP server URL (repeatable)")
+    run_parser.add_argument("--all-known", action="store_true", help="Harvest every server from 'erddap-cli servers'")
+    run_parser.add_argument("--workers", type=int, default=16, help="Concurrent info requests per server (default: 16)")
+    run_parser.add_argument("--index", help=f"Index file (default: {get_index_path()})")
+    run_parser.set_defaults(func=handle_harvest_run)
+
+    # Query
+    query_parser = harvest_subparsers.add_parser(
+        "query",
+        help="Search the harvested index for variables (no network access)."
+    )
+    query_parser.add_argument("--standard-name", help="CF standard_name, * wildcards allowed")
+    query_parser.add_argument("--units",         help="Units string, * wildcards allowed")
+    query_parser.add_argument("--variable",      help="Variable name, * wildcards allowed")
+    query_parser.add_argument("--server",        help="Only datasets from this server")
+    query_parser.add_argument("--min-lon",   type=float, help="Minimum Longitude")
+    query_parser.add_argument("--max-lon",   type=float, help="Maximum Longitude")
+    query_parser.add_argument("--min-lat",   type=float, help="Minimum Latitude")
+    query_parser.add_argument("--max-lat",   type=float, help="Maximum Latitude")
+    query_parser.add_argument("--min-time",  type=str,   help="Minimum Time (ISO format)")
+    query_parser.add_argument("--max-time",  type=str,   help="Maximum Time (ISO format)")
+    query_parser.add_argument("--value-min", type=float, help="Variable actual_range must reach at least this value")
+    query_parser.add_argument("--value-max", type=float, help="Variable actual_range must start at or below this value")
+    query_parser.add_argument(
+        "--output-format", choices=["text", "json"], default="text",
+        help="Output format: text (default) or json"
+    )
+    query_parser.add_argument("--index", help=f"Index file (default: {get_index_path()})")
+    query_parser.set_defaults(func=handle_harvest_query)
+
+def handle_harvest_run(args):
+    servers = list(args.server or [])
+    if args.all_known:
+        servers += [s["url"] for s in list_known_servers()]
+    if not servers:
+        print("Specify --server (repeatable) or --all-known.")
+        return
+
+    conn = open_index(args.index)
+    try:
+        for server in dict.fromkeys(servers):
+            print(f"\nHarvesting {server} ...")
+
+            def progress(done, total):
+                if done % 50 == 0 or done == total:
+                    print(f"    {done}/{total} datasets")
+            try:
+                stored, failed = harvest_server(server, conn, args.workers, progress)
+            except Exception as e:
+                print(f"    Could not list datasets: {e}")
+                continue
+            print(f"    Stored {stored} datasets, {len(failed)} failed")
+            for did, err in failed[:10]:
+                print(f"    - {did}: {err}")
+            if len(failed) > 10:
+                print(f"    ... and {len(failed) - 10} more")
+    finally:
+        conn.close()
+
+def handle_harvest_query(args):
+    conn = open_index(args.index)
+    try:
+        rows = query_index(
+            conn,
+            standard_name=args.standard_name, units=args.units, variable=args.variable, server=args.server,
+            min_lon=args.min_lon, max_lon=args.max_lon, min_lat=args.min_lat, max_lat=args.max_lat,
+            min_time=args.min_time, max_time=args.max_time,
+            value_min=args.value_min, value_max=args.value_max,
+        )
+    finally:
+        conn.close()
+
+    if args.output_format == "json":
+        print(json.dumps(rows, indent=2))
+        return
+    if not rows:
+        print("No matching variables in the index.")
+        return
+    print(f"\n{len(rows)} matching variables:\n")
+    for row in rows:
+        value_range = ''
+        if row["min_value"] is not None and row["max_value"] is not None:
+            value_range = f" [{row['min_value']} to {row['max_value']}]"
+        print(f"- {row['dataset_id']}: {row['name']} ({row['units'] or 'N/A'}){value_range}")
+        print(f"    Server: {row['server']}")
+        print(f"    Title:  {row['title']}")
+
+def handle_harvest_summary(args):
+    conn = open_index(getattr(args, "index", None))
+    try:
+        summary = index_summary(conn)
+    finally:
+        conn.close()
+    if not summary:
+        print("The index is empty. Run 'erddap-cli harvest run --server <url>' first.")
+        return
+    print(f"\nMetadata index: {get_index_path()}\n")
+    for row in summary:
+        when = datetime.datetime.fromtimestamp(row["harvested"]).strftime("%Y-%m-%d %H:%M")
+        print(f"- {row['server']}: {row['datasets']} datasets, {row['variables']} variables (last harvest {when})")
@@ -0,0 +1,95 @@
+# erddap_cli/commands/matchup.py
+
+import time
+import requests
+import pandas as pd
+from erddap_cli.client.session import get_dataset_info
+from erddap_cli.client.matchup import matchup_points, METHODS
+
+# Point columns tried for a dimension when the CSV has no column of that name
+COLUMN_ALIASES = {
+    "latitude":  ["lat", "Latitude", "LAT"],
+    "longitude": ["lon", "long", "Longitude", "LON"],
+    "time":      ["Time", "datetime", "date"],
+}
+
+
+def setup_matchup_command(subparsers):
+    """
+    Register the 'matchup' subcommand to extract griddap values at CSV points.
+    """
+    parser = subparsers.add_parser(
+        "matchup",
+        help="Extract griddap values at many (time, lat, lon) points from a CSV with a few compact requests."
+    )
+    parser.add_argument("--server", required=True, help="ERDDAP server URL")
+    parser.add_argument("--dataset-id", required=True, help="Griddap dataset ID")
+    parser.add_argument("--variables", required=True, help="Comma-separated griddap variables, e.g. sst,chlorophyll")
+    parser.add_argument("--points", required=True, help="CSV file with one row per point")
+    parser.add_argument("--output", required=True, help="Output CSV: the input rows with the extracted values appended")
+    parser.add_argument("--method", choices=METHODS, default="nearest",
+                        help="nearest grid cell (default) or linear interpolation between cells")
+    parser.add_argument("--column", action="append", default=[],
+                        help="Map a dimension to a point column, e.g. time=obs_time (repeatable)")
+    parser.add_argument("--tile",
+                        help="Comma-separated box edge in grid steps per dimension (default: 8 for leading dims, 32 for lat/lon)")
+    parser.add_argument("--prefix", default="", help="Prefix for the added columns")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.set_defaults(func=handle_matchup)
+
+def _column_map(args, dimensions, point_columns):
+    columns = {}
+    for item in args.column:
+        if "=" not in item:
+            raise ValueError(f"Could not parse --column {item!r}; use dimension=column.")
+        dim, col = (part.strip() for part in item.split("=", 1))
+        if col not in point_columns:
+            raise ValueError(f"Column {col!r} is not in the points file.")
+        columns[dim] = col
+    for dim in dimensions:
+        name = dim["name"]
+        if name in columns or name in point_columns:
+            continue
+        alias = next((a for a in COLUMN_ALIASES.get(name, []) if a in point_columns), None)
+        if alias:
+            columns[name] = alias
+    return columns
+
+def handle_matchup(args):
+    variables = [v.strip() for v in args.variables.split(",") if v.strip()]
+    try:
+        points = pd.read_csv(args.points)
+    except Exception as e:
+        print(f"Could not read points file: {e}")
+        return
+
+    try:
+        info = get_dataset_info(args.server, args.dataset_id)
+        columns = _column_map(args, info.get("dimensions", []), set(points.columns))
+        tile = [int(t) for t in args.tile.split(",")] if args.tile else None
+    except (ValueError, RuntimeError, requests.RequestException) as e:
+        print(e)
+        return
+
+    print(f"\nMatching {len(points)} points against {args.dataset_id} ({args.method}) ...")
+
+    def progress(done, total):
+        if done % 10 == 0 or done == total:
+            print(f"    {done}/{total} requests")
+
+    start = time.perf_counter()
+    try:
+        values, stats = matchup_points(
+            args.server, args.dataset_id, variables, points, columns=columns, method=args.method,
+            tile=tile, workers=args.workers, info=info, progress=progress,
+        )
+    except (ValueError, RuntimeError, requests.RequestException) as e:
+        print(e)
+        return
+    elapsed = time.perf_counter() - start
+
+    out = pd.concat([points, values.add_prefix(args.prefix)], axis=1)
+    out.to_csv(args.output, index=False)
+    print(f"\n{stats['points']} points, {stats['outside']} outside the grid.")
+    print(f"{stats['requests']} requests, {stats['cells']} grid cells fetched in {elapsed:.1f}s.")
+    print(f"Saved to {args.output}")
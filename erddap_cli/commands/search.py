@@ -1,10 +1,13 @@
 # erddap_cli/commands/search.py
 import argparse
+import requests
 from erddap_cli.client.session import (
     build_search_url,
     search_datasets,
     get_total_count,
 )
+from erddap_cli.client.api import ErddapClient
+from erddap_cli.client.facets import facet_counts, is_restrictive, DEFAULT_MAX_VALUES
 
 def setup_search_command(subparsers):
     parser = subparsers.add_parser(
@@ -24,10 +27,60 @@ def setup_search_command(subparsers):
         "--no-show-total", action="store_false", dest="show_total",
         help="Skip fetching total matching-dataset count"
     )
+    parser.add_argument(
+        "--facets",
+        help="Comma-separated categorize attributes to count matches by, e.g. institution,cdm_data_type,standard_name"
+    )
+    parser.add_argument("--facet-limit", type=int, default=20, help="Values shown per facet (default: 20)")
+    parser.add_argument(
+        "--facet-max-values", type=int, default=DEFAULT_MAX_VALUES,
+        help=f"Skip facets with more values than this; each value costs one request (default: {DEFAULT_MAX_VALUES})"
+    )
     parser.set_defaults(func=handle_search)
 
+def _print_facets(args, match_rows):
+    facets = [f.strip() for f in args.facets.split(",") if f.strip()]
+    match_ids = None if match_rows is None else [str(r.get("Dataset ID")) for r in match_rows]
+    with ErddapClient(args.server) as client:
+        results = facet_counts(client, facets, match_ids, max_values=args.facet_max_values, rows=match_rows)
+    scope = "all datasets" if match_ids is None else f"{len(match_ids)} matching datasets"
+    for facet in facets:
+        values = results[facet]["values"]
+        if results[facet]["skipped"]:
+            print(f"\n{facet}: {results[facet]['skipped']} values, not counted (one request per value; raise --facet-max-values to count them)")
+            continue
+        print(f"\n{facet} ({len(values)} values, {scope}):")
+        if results[facet]["error"]:
+            print(f"    Could not fetch: {results[facet]['error']}")
+        for value, count in values[:args.facet_limit]:
+            print(f"    {count:>6}  {value}")
+        if len(values) > args.facet_limit:
+            print(f"    ... and {len(values) - args.facet_limit} more")
+
 def handle_search(args):
-    if args.show_total:
+    bounds = dict(
+        min_lon=args.min_lon, max_lon=args.max_lon,
+        min_lat=args.min_lat, max_lat=args.max_lat,
+        min_time=args.min_time, max_time=args.max_time,
+    )
+    match_rows = None
+    if args.facets and is_restrictive(args.query, **bounds):
+        # One full search gives the total, the IDs the facets are intersected
+        # with and the Institution column, which is counted without more requests
+        try:
+            with ErddapClient(args.server) as client:
+                match_rows = client.search_all(args.query, **bounds)
+        except requests.HTTPError as e:
+            # ERDDAP answers a search with no matches with a 404
+            if e.response is None or e.response.status_code != 404:
+                print(f"Could not determine total matching datasets: {e}")
+            else:
+                match_rows = []
+        except Exception as e:
+            print(f"Could not determine total matching datasets: {e}")
+        if args.show_total and match_rows is not None:
+            print(f"Found {len(match_rows)} datasets (showing page {args.page}, {args.items_per_page} items)")
+    elif args.show_total:
         total = get_total_count(
             args.server, args.query,
             min_lon=args.min_lon, max_lon=args.max_lon,
@@ -53,3 +106,6 @@ def handle_search(args):
         did = item.get("Dataset ID") or item.get("dataset_id", "N/A")
         title = item.get("Title")    or item.get("title",     "N/A")
         print(f"- {did}: {title}")
+
+    if args.facets:
+        _print_facets(args, match_rows)
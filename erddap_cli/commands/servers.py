@@ -1,7 +1,6 @@
 # erddap_cli/commands/servers.py
 
-from erddap_cli.client.session import list_known_servers, add_custom_server, remove_custom_server
-import requests
+from erddap_cli.client.session import list_known_servers, add_custom_server, remove_custom_server, get_http_session
 
 
 def setup_servers_command(subparsers):
@@ -52,7 +51,7 @@ def handle_servers_status(args):
         version_url = f"{base_url}/version"
         capabilities_url = f"{base_url}/info/index.html"
         try:
-            resp = requests.get(version_url, timeout=5)
+            resp = get_http_session().get(version_url, timeout=5)
             if resp.status_code == 200:
                 version = resp.text.strip()
             else:
@@ -60,7 +59,7 @@ def handle_servers_status(args):
         except Exception as e:
             version = f"Error: {e}"
         try:
-            cap_resp = requests.get(capabilities_url, timeout=5)
+            cap_resp = get_http_session().get(capabilities_url, timeout=5)
             if cap_resp.status_code == 200:
                 capabilities = "OK"
             else:
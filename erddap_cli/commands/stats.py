@@ -0,0 +1,88 @@
+# erddap_cli/commands/stats.py
+
+import os
+import re
+import json
+import time
+import datetime
+from erddap_cli.client.journal import open_journal, journal_stats, prometheus_text, get_journal_path
+
+_SINCE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhd])$")
+_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def setup_stats_command(subparsers):
+    """
+    Register the 'stats' subcommand to summarize the request journal.
+    """
+    parser = subparsers.add_parser(
+        "stats",
+        help="Show latency percentiles, throughput, error rates and cache hits per server and endpoint."
+    )
+    parser.add_argument("--server",   help="Only requests to this server")
+    parser.add_argument("--endpoint", help="Only this endpoint, e.g. tabledap.csv, griddap.dods, info, search")
+    parser.add_argument("--since",    help="Only recent requests: 30m, 24h, 7d or an ISO date")
+    parser.add_argument(
+        "--output-format", choices=["text", "json"], default="text",
+        help="Output format: text (default) or json"
+    )
+    parser.add_argument("--prometheus", metavar="FILE",
+                        help="Also write the metrics to FILE in Prometheus text format (for the node_exporter textfile collector)")
+    parser.add_argument("--journal", help=f"Journal file (default: {get_journal_path()})")
+    parser.set_defaults(func=handle_stats)
+
+def _parse_since(text):
+    m = _SINCE_RE.match(text.strip())
+    if m:
+        return time.time() - float(m.group(1)) * _SECONDS[m.group(2)]
+    when = datetime.datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return when.timestamp()
+
+def _ms(value):
+    return "-" if value is None else f"{value:.0f}"
+
+def handle_stats(args):
+    try:
+        since = _parse_since(args.since) if args.since else None
+    except ValueError:
+        print(f"Could not parse --since {args.since!r}; use e.g. 30m, 24h, 7d or 2024-05-01.")
+        return
+
+    conn = open_journal(args.journal)
+    try:
+        stats = journal_stats(conn, server=args.server, endpoint=args.endpoint, since=since)
+    finally:
+        conn.close()
+
+    if args.prometheus:
+        # Write then rename, so a collector never reads a half-written file
+        tmp = f"{args.prometheus}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text(stats))
+        os.replace(tmp, args.prometheus)
+
+    if args.output_format == "json":
+        print(json.dumps(stats, indent=2))
+        return
+    if not stats:
+        print("No requests recorded yet.")
+        return
+
+    header = f"    {'endpoint':<16}{'requests':>9}{'error %':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'TTFB p50':>10}{'MB':>9}{'MB/s':>8}{'cache hit/miss':>16}"
+    current = None
+    for s in stats:
+        if s["server"] != current:
+            current = s["server"]
+            print(f"\n{current}")
+            print(header)
+        throughput = "-" if s["throughput"] is None else f"{s['throughput']:.2f}"
+        cache = f"{s['cache_hits']}/{s['cache_misses']}"
+        print(
+            f"    {s['endpoint']:<16}{s['requests']:>9}{s['error_rate']:>8.1%}"
+            f"{_ms(s['p50_ms']):>9}{_ms(s['p95_ms']):>9}{_ms(s['p99_ms']):>9}{_ms(s['ttfb_p50_ms']):>10}"
+            f"{s['bytes'] / 1e6:>9.2f}{throughput:>8}{cache:>16}"
+        )
+    if args.prometheus:
+        print(f"\nPrometheus metrics written to {args.prometheus}")